@@ -1,11 +1,16 @@
 from flask import Flask, request, render_template, jsonify, session
 from scripts.demo_stopword_removal import KhmerStopwordRemover
-from src.preprocessing.unicode_normalizer import normalize_text
 import os
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from src.database.connection_pool import ConnectionPool
+from src.database.write_behind import WriteBehindQueue, QueueClosed
+from src.database.token_vocabulary import TokenVocabulary
 from datetime import datetime
 import json
+import hmac
+import atexit
+from collections import Counter
 
 app = Flask(__name__)
 app.config['JSON_AS_ASCII'] = False
@@ -20,8 +25,49 @@ DB_CONFIG = {
     'port': '5432'
 }
 
+# Connection pool shared by all routes
+DB_POOL_CONFIG = {
+    'min_size': 1,
+    'max_size': 10,
+    'timeout': 5.0,        # seconds to wait for a free connection
+    'health_check': True   # SELECT 1 on checkout
+}
+
+db_pool = ConnectionPool(lambda: psycopg2.connect(**DB_CONFIG), **DB_POOL_CONFIG)
+
+# Background batching of text_analysis inserts
+WRITE_BEHIND_CONFIG = {
+    'batch_size': 100,
+    'flush_interval': 1.0,  # seconds to wait for a batch to fill
+    'max_queue': 10000,
+    'on_full': 'block',     # or 'drop'
+    'put_timeout': 0.5      # seconds a request may block on a full queue
+}
+
+# Store filtered/removed tokens as INTEGER[] ids into token_vocabulary
+# instead of JSONB string arrays; frequency_stats is then rebuilt on read
+COMPACT_TOKEN_STORAGE = False
+
+token_vocab = TokenVocabulary()
+
 remover = KhmerStopwordRemover()
 
+# Shared secret for /admin routes; they are disabled when unset
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Pick up edits to the stopword list without a restart (0 disables polling).
+# /admin/reload_stopwords only swaps the list in the worker serving it, so
+# polling is always on while that route is enabled: every other worker
+# follows within one interval.
+ADMIN_RELOAD_INTERVAL = 5
+STOPWORD_RELOAD_INTERVAL = (
+    remover.config.get('stopword_removal', {}).get('reload_interval', 0)
+    or (ADMIN_RELOAD_INTERVAL if ADMIN_TOKEN else 0)
+)
+
+# Upper bound on documents accepted by /api/analyze/batch
+MAX_BATCH_SIZE = 1000
+
 # Language dictionary - Fixed to avoid Python method names
 LANGUAGES = {
     'km': {
@@ -66,7 +112,7 @@ LANGUAGES = {
         'footer_text': 'ប្រព័ន្ធវិភាគភាសាធម្មជាតិខ្មែរ',
         'copyright': '© 2026 កម្មវិធីវិភាគអត្ថបទខ្មែរ',
         'contact': 'ទំនាក់ទំនង: info@AMS.edu.kh',
-        'saved_to_db': 'លទ្ធផលត្រូវបានរក្សាទុកក្នុងមូលដ្ឋានទិន្នន័យ',
+        'queued_for_db': 'លទ្ធផលត្រូវបានដាក់ក្នុងជួរ ដើម្បីរក្សាទុកក្នុងមូលដ្ឋានទិន្នន័យ',
         'copy_token': 'បានចម្លងពាក្យទៅក្ដារតម្បៀតខ្ទាស់',
         'exported': 'បាននាំចេញជាទ្រង់ទ្រាយ',
         'enter_text': 'សូមបញ្ចូលអត្ថបទមុនពេលវិភាគ',
@@ -117,7 +163,7 @@ LANGUAGES = {
         'footer_text': 'Khmer Natural Language Processing System',
         'copyright': '© 2026 Khmer Text Analysis Program',
         'contact': 'Contact: info@AMS.edu.kh',
-        'saved_to_db': 'Results saved to database',
+        'queued_for_db': 'Results queued for saving to the database',
         'copy_token': 'Copied word to clipboard',
         'exported': 'Exported as format',
         'enter_text': 'Please enter text before analyzing',
@@ -128,34 +174,122 @@ LANGUAGES = {
     }
 }
 
+def format_analysis(analysis):
+    """Shape a KhmerStopwordRemover analysis for the JSON API"""
+    return {
+        'filtered_tokens': analysis['filtered'],
+        'removed_tokens': analysis['removed'],
+        'removed_positions': analysis['removed_positions'],
+        'frequency_tokens': analysis['frequency'],
+        'linguistic_features': analysis['linguistic'],
+        'segmented_text': analysis['segmented'],
+        'stopwords_version': analysis['stopwords_version'],
+        'stats': {
+            'original_tokens': analysis['stats']['original_tokens'],
+            'filtered_tokens': analysis['stats']['filtered_tokens'],
+            'removed_tokens': analysis['stats']['removed_tokens']
+        }
+    }
+
 def get_db_connection():
-    """Create a database connection"""
-    conn = psycopg2.connect(**DB_CONFIG)
-    return conn
+    """Check out a pooled database connection (use as a context manager)"""
+    return db_pool.connection()
+
+def insert_analyses(conn, rows):
+    """Insert a batch of text_analysis rows in one statement.
+
+    Returns the token_vocabulary rows created on the way; they are cached
+    by analysis_writer only after the transaction commits.
+    """
+    new_tokens = []
+    if COMPACT_TOKEN_STORAGE:
+        ids, new_tokens = token_vocab.intern(conn, [
+            token
+            for row in rows
+            for token in row['filtered_tokens'] + row['removed_tokens']
+        ])
+        columns = 'filtered_token_ids, removed_token_ids'
+        values = [(
+            row['original_text'],
+            [ids[token] for token in row['filtered_tokens']],
+            [ids[token] for token in row['removed_tokens']],
+            json.dumps(row['linguistic_stats'], ensure_ascii=False),
+            row['text_length'],
+            row['stopwords_removed'],
+            row['reduction_percentage']
+        ) for row in rows]
+    else:
+        columns = 'filtered_tokens, removed_tokens, frequency_stats'
+        values = [(
+            row['original_text'],
+            json.dumps(row['filtered_tokens'], ensure_ascii=False),
+            json.dumps(row['removed_tokens'], ensure_ascii=False),
+            json.dumps(row['frequency_stats'], ensure_ascii=False),
+            json.dumps(row['linguistic_stats'], ensure_ascii=False),
+            row['text_length'],
+            row['stopwords_removed'],
+            row['reduction_percentage']
+        ) for row in rows]
 
-def create_tables():
-    """Create necessary tables if they don't exist"""
-    conn = get_db_connection()
     cur = conn.cursor()
-    
-    cur.execute('''
-        CREATE TABLE IF NOT EXISTS text_analysis (
-            id SERIAL PRIMARY KEY,
-            original_text TEXT NOT NULL,
-            filtered_tokens JSONB,
-            removed_tokens JSONB,
-            frequency_stats JSONB,
-            linguistic_stats JSONB,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            text_length INTEGER,
-            stopwords_removed INTEGER,
-            reduction_percentage FLOAT
-        )
-    ''')
-    
-    conn.commit()
+    execute_values(cur, f'''
+        INSERT INTO text_analysis 
+        (original_text, {columns}, 
+         linguistic_stats, text_length, stopwords_removed, reduction_percentage)
+        VALUES %s
+    ''', values, page_size=len(values))
     cur.close()
-    conn.close()
+    return new_tokens
+
+def rehydrate_tokens(conn, analysis):
+    """Expand token-id columns of a compact row back into token lists"""
+    filtered_ids = analysis.pop('filtered_token_ids', None)
+    removed_ids = analysis.pop('removed_token_ids', None)
+    if filtered_ids is None or analysis.get('filtered_tokens') is not None:
+        return analysis
+    
+    analysis['filtered_tokens'], unknown = token_vocab.decode(conn, filtered_ids)
+    analysis['removed_tokens'], unknown_removed = token_vocab.decode(conn, removed_ids or [])
+    if unknown or unknown_removed:
+        analysis['unknown_token_ids'] = sorted(set(unknown) | set(unknown_removed))
+    analysis['frequency_stats'] = dict(Counter(analysis['filtered_tokens']))
+    return analysis
+
+analysis_writer = WriteBehindQueue(
+    db_pool, insert_analyses, on_commit=token_vocab.remember, **WRITE_BEHIND_CONFIG
+)
+atexit.register(analysis_writer.close)
+
+def create_tables():
+    """Create necessary tables if they don't exist"""
+    with get_db_connection() as conn:
+        cur = conn.cursor()
+        
+        cur.execute('''
+            CREATE TABLE IF NOT EXISTS text_analysis (
+                id SERIAL PRIMARY KEY,
+                original_text TEXT NOT NULL,
+                filtered_tokens JSONB,
+                removed_tokens JSONB,
+                frequency_stats JSONB,
+                linguistic_stats JSONB,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                text_length INTEGER,
+                stopwords_removed INTEGER,
+                reduction_percentage FLOAT
+            )
+        ''')
+        
+        # Compact storage: token ids referencing token_vocabulary
+        token_vocab.create_table(cur)
+        cur.execute('''
+            ALTER TABLE text_analysis
+                ADD COLUMN IF NOT EXISTS filtered_token_ids INTEGER[],
+                ADD COLUMN IF NOT EXISTS removed_token_ids INTEGER[]
+        ''')
+        
+        conn.commit()
+        cur.close()
 
 def get_language():
     """Get current language from session, default to Khmer"""
@@ -180,17 +314,16 @@ def home():
                                  lang=LANGUAGES[lang],
                                  current_lang=lang)
         
-        # Process text
-        original_tokens = remover.segmenter.segment(normalize_text(text))
-        filtered_tokens = remover.remove_stopwords(text)
-        removed_tokens = [t for t in original_tokens if t not in filtered_tokens]
-        frequency_tokens = remover.Frequency(filtered_tokens)
-        linguistic_ = remover.linguistic_features(filtered_tokens)
-        segmented_ = remover.segmented_text(text)
+        # Process text (single normalize + segment pass)
+        analysis = remover.analyze(text)
+        filtered_tokens = analysis['filtered']
+        removed_tokens = analysis['removed']
+        frequency_tokens = analysis['frequency']
+        linguistic_ = analysis['linguistic']
         
         # Calculate statistics
-        removed_count = len(removed_tokens)
-        reduction_percentage = (removed_count / len(original_tokens) * 100) if original_tokens else 0
+        removed_count = analysis['stats']['removed_tokens']
+        reduction_percentage = analysis['stats']['reduction_percentage']
         
         # Prepare result
         result = {
@@ -199,44 +332,28 @@ def home():
             'removed_text': removed_tokens,
             'frequency_tokens': frequency_tokens,
             'linguistic_': linguistic_,
-            'segmented_': segmented_,
-            'stats': {
-                'original_tokens': len(original_tokens),
-                'filtered_tokens': len(filtered_tokens),
-                'removed_tokens': removed_count,
-                'reduction_percentage': round(reduction_percentage, 2)
-            }
+            'segmented_': analysis['segmented'],
+            'stats': analysis['stats']
         }
         
-        # Save to database
+        # Queue for the background writer; the row is written later, so
+        # only report that it was queued
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-            
-            cur.execute('''
-                INSERT INTO text_analysis 
-                (original_text, filtered_tokens, removed_tokens, frequency_stats, 
-                 linguistic_stats, text_length, stopwords_removed, reduction_percentage)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ''', (
-                text,
-                json.dumps(filtered_tokens, ensure_ascii=False),
-                json.dumps(removed_tokens, ensure_ascii=False),
-                json.dumps(frequency_tokens, ensure_ascii=False),
-                json.dumps(linguistic_, ensure_ascii=False),
-                len(text),
-                removed_count,
-                reduction_percentage
-            ))
-            
-            conn.commit()
-            cur.close()
-            conn.close()
-            
-            result['saved_to_db'] = True
-        except Exception as e:
-            result['saved_to_db'] = False
-            result['db_error'] = str(e)
+            result['queued_for_db'] = analysis_writer.submit({
+                'original_text': text,
+                'filtered_tokens': filtered_tokens,
+                'removed_tokens': removed_tokens,
+                'frequency_stats': frequency_tokens,
+                'linguistic_stats': linguistic_,
+                'text_length': len(text),
+                'stopwords_removed': removed_count,
+                'reduction_percentage': reduction_percentage
+            })
+            if not result['queued_for_db']:
+                result['db_error'] = 'Database write queue is full'
+        except QueueClosed:
+            result['queued_for_db'] = False
+            result['db_error'] = 'Database writer is shutting down'
     
     return render_template('index.html', 
                          result=result, 
@@ -252,46 +369,101 @@ def api_analyze():
     if not text.strip():
         return jsonify({'error': 'Text is required'}), 400
     
-    # Process text
-    original_tokens = remover.segmenter.segment(normalize_text(text))
-    filtered_tokens = remover.remove_stopwords(text)
-    removed_tokens = [t for t in original_tokens if t not in filtered_tokens]
-    frequency_tokens = remover.Frequency(filtered_tokens)
-    linguistic_ = remover.linguistic_features(filtered_tokens)
-    segmented_ = remover.segmented_text(text)
+    # Process text (single normalize + segment pass)
+    analysis = remover.analyze(text)
+    
+    return jsonify(format_analysis(analysis))
+
+@app.route('/api/analyze/batch', methods=['POST'])
+def api_analyze_batch():
+    """API endpoint for analyzing a list of documents in one request"""
+    data = request.get_json(silent=True) or {}
+    texts = data.get('texts')
+    
+    if not isinstance(texts, list) or not texts:
+        return jsonify({'error': 'texts must be a non-empty list'}), 400
+    if len(texts) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'At most {MAX_BATCH_SIZE} texts per batch'}), 400
+    if not all(isinstance(t, str) and t.strip() for t in texts):
+        return jsonify({'error': 'Every text must be a non-empty string'}), 400
+    
+    batch = remover.analyze_many(texts)
     
     return jsonify({
-        'filtered_tokens': filtered_tokens,
-        'removed_tokens': removed_tokens,
-        'frequency_tokens': frequency_tokens,
-        'linguistic_features': linguistic_,
-        'segmented_text': segmented_,
-        'stats': {
-            'original_tokens': len(original_tokens),
-            'filtered_tokens': len(filtered_tokens),
-            'removed_tokens': len(removed_tokens)
-        }
+        'documents': [format_analysis(a) for a in batch['documents']],
+        'stats': batch['stats']
     })
 
+@app.route('/api/stopwords', methods=['GET'])
+def api_stopwords_info():
+    """Identify the stopword list being served"""
+    return jsonify({
+        'path': remover.stopwords_path,
+        'count': len(remover.stopwords),
+        'checksum': remover.stopwords_checksum
+    })
+
+@app.before_request
+def start_stopword_watcher():
+    # Started lazily, like the write-behind thread, so each worker runs its
+    # own watcher even when the app is preloaded and forked
+    if STOPWORD_RELOAD_INTERVAL:
+        remover.watch_stopwords(STOPWORD_RELOAD_INTERVAL)
+
+@app.route('/admin/reload_stopwords', methods=['POST'])
+def admin_reload_stopwords():
+    """Reload the stopword list from disk and swap it in"""
+    if not ADMIN_TOKEN:
+        return jsonify({'success': False, 'error': 'Admin routes are disabled'}), 403
+    supplied = request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(supplied.encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+        return jsonify({'success': False, 'error': 'Invalid admin token'}), 403
+    
+    try:
+        checksum = remover.reload_stopwords()
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    return jsonify({
+        'success': True,
+        'path': remover.stopwords_path,
+        'count': len(remover.stopwords),
+        'checksum': checksum,
+        # Other workers reload when their watcher sees the file's new mtime
+        'other_workers_within_seconds': STOPWORD_RELOAD_INTERVAL
+    })
+
+@app.route('/api/cache', methods=['GET'])
+def api_cache_stats():
+    """Segmentation cache counters"""
+    cache = remover.segmenter.cache
+    if cache is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(cache.stats(), enabled=True))
+
+@app.route('/api/writer', methods=['GET'])
+def api_writer_stats():
+    """Write-behind queue depth and flush metrics"""
+    return jsonify(analysis_writer.stats())
+
 @app.route('/history', methods=['GET'])
 def get_history():
     """Get analysis history"""
     lang = get_language()
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    cur.execute('''
-        SELECT id, original_text, timestamp, text_length, 
-               stopwords_removed, reduction_percentage
-        FROM text_analysis 
-        ORDER BY timestamp DESC 
-        LIMIT 10
-    ''')
-    
-    history = cur.fetchall()
-    
-    cur.close()
-    conn.close()
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        cur.execute('''
+            SELECT id, original_text, timestamp, text_length, 
+                   stopwords_removed, reduction_percentage
+            FROM text_analysis 
+            ORDER BY timestamp DESC 
+            LIMIT 10
+        ''')
+        
+        history = cur.fetchall()
+        
+        cur.close()
     
     return render_template('history.html', 
                          history=history,
@@ -301,20 +473,22 @@ def get_history():
 @app.route('/history/<int:id>', methods=['GET'])
 def get_analysis_details(id):
     """Get detailed analysis by ID"""
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    cur.execute('''
-        SELECT * FROM text_analysis WHERE id = %s
-    ''', (id,))
-    
-    analysis = cur.fetchone()
-    
-    cur.close()
-    conn.close()
+    with get_db_connection() as conn:
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        
+        cur.execute('''
+            SELECT * FROM text_analysis WHERE id = %s
+        ''', (id,))
+        
+        analysis = cur.fetchone()
+        
+        cur.close()
+        
+        if analysis:
+            analysis = rehydrate_tokens(conn, dict(analysis))
     
     if analysis:
-        return jsonify(dict(analysis))
+        return jsonify(analysis)
     return jsonify({'error': 'Analysis not found'}), 404
 
 @app.route('/set_language/<lang>', methods=['POST'])
@@ -332,5 +506,6 @@ def get_current_language():
     return jsonify({'language': lang, 'strings': LANGUAGES[lang]})
 
 if __name__ == '__main__':
+    db_pool.prefill()
     create_tables()  # Create tables on startup
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,328 @@
+import asyncio
+import argparse
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+from bs4 import BeautifulSoup
+
+from sc import WorkingKhmerScraper
+from crawl_frontier import CrawlFrontier
+from src.preprocessing.article_store import ArticleStore
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, with bursts of up to
+    `burst` requests. Waiters are served in arrival order."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncKhmerCrawler:
+    """Crawls many sites at once with WorkingKhmerScraper's link finding and
+    extraction.
+
+    Politeness is enforced per host by a token bucket, so a slow site only
+    throttles itself. All requests share one keep-alive connection pool of
+    at most `concurrency` connections. With a CrawlFrontier, article URLs
+    finished in earlier runs are skipped (or revalidated with conditional
+    GETs when recheck is set). With an ArticleStore, each article is
+    appended as soon as it is parsed. Frontier calls run on the event loop:
+    they are indexed lookups and WAL commits without fsync, about 0.06 ms
+    per article against a network fetch, and the sqlite3 connection is
+    bound to this thread anyway. Use as an async context manager:
+
+        async with AsyncKhmerCrawler() as crawler:
+            results = await crawler.crawl(sites)
+    """
+
+    def __init__(
+        self,
+        concurrency=8,
+        per_host_rate=0.5,
+        burst=1,
+        timeout=15,
+        frontier=None,
+        recheck=False,
+        store=None,
+        extractor=None,
+    ):
+        self.scraper = WorkingKhmerScraper(extractor=extractor)
+        self.store = store
+        self.frontier = frontier
+        self.recheck = recheck
+        self.concurrency = concurrency
+        self.per_host_rate = per_host_rate
+        self.burst = burst
+        self.timeout = timeout
+        self.buckets = {}
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(
+            headers=self.scraper.headers,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+
+    def bucket(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.per_host_rate, self.burst)
+        return self.buckets[host]
+
+    async def request(self, url, headers=None):
+        """GET url once its host's bucket allows; returns (status, headers,
+        body), or None on a network error"""
+        await self.bucket(url).acquire()
+        try:
+            async with self.session.get(url, headers=headers) as response:
+                body = await response.read() if response.status == 200 else None
+                return response.status, response.headers, body
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"  Failed to fetch {url}: {e}")
+            return None
+
+    async def fetch(self, url):
+        """Body bytes of url, or None on a non-200 response or network error"""
+        result = await self.request(url)
+        if result is None:
+            return None
+        status, _, body = result
+        if status != 200:
+            print(f"  HTTP {status}: {url}")
+        return body
+
+    async def fetch_article(self, url, site=None):
+        headers = {}
+        if self.frontier is not None:
+            headers = self.frontier.conditional_headers(url)
+
+        result = await self.request(url, headers)
+        status = result[0] if result else None
+        if status != 200:
+            if status not in (None, 304):
+                print(f"  HTTP {status}: {url}")
+            if self.frontier is not None:
+                self.frontier.record_fetch(url, status, site=site)
+            return None
+        _, headers, html = result
+
+        # Parsing is CPU-bound; keep it off the event loop
+        article = await asyncio.to_thread(self.scraper.parse_article, url, html)
+        content = article["content"] if article else None
+        if self.frontier is not None and not self.frontier.has_changed(url, content):
+            self.frontier.record_fetch(url, 200, content, headers, site)
+            return None
+
+        # Store before marking the URL done (see scrape_article_content)
+        if article and self.store is not None:
+            self.store.append(article)
+        if self.frontier is not None:
+            self.frontier.record_fetch(url, 200, content, headers, site)
+        return article
+
+    async def crawl_site(self, url, max_articles=50):
+        """Async counterpart of WorkingKhmerScraper.scrape_khmer_news; the
+        articles on each listing page are fetched concurrently"""
+        articles = []
+        visited = set()
+        page = 1
+
+        print(f"Starting to crawl: {url}")
+
+        if self.frontier is not None:
+            # Finish what an interrupted run left behind first
+            resumed = self.frontier.pending(site=url)
+            if resumed:
+                print(f"  Resuming {len(resumed)} pending articles from {url}")
+                await self.crawl_articles(resumed, articles, max_articles, url)
+
+        while len(articles) < max_articles:
+            try:
+                current_url = self.scraper.page_url(url, page)
+                html = await self.fetch(current_url)
+                if html is None:
+                    print(f"  Failed to load page {page} of {url}")
+                    break
+
+                soup = await asyncio.to_thread(BeautifulSoup, html, "html.parser")
+                article_links = self.scraper.find_article_links(soup, url)
+                if not article_links:
+                    article_links = self.scraper.find_links_by_pattern(soup, url)
+                if not article_links:
+                    print(f"  No article links found on page {page} of {url}")
+                    break
+
+                candidates = [link for link in article_links if link not in visited]
+                if self.frontier is not None:
+                    self.frontier.add(article_links, site=url)
+                    candidates = self.frontier.select(candidates, self.recheck)
+                candidates = candidates[:10]
+                if not candidates:
+                    print(f"  Nothing new on page {page} of {url}")
+                    break
+                visited.update(candidates)
+                await self.crawl_articles(candidates, articles, max_articles, url)
+
+                print(f"  {url} page {page}: {len(articles)} articles so far")
+                page += 1
+
+            except Exception as e:
+                print(f"Error on page {page} of {url}: {str(e)}")
+                break
+
+        return articles
+
+    async def crawl_articles(self, urls, articles, max_articles, site=None):
+        """Fetch urls concurrently, appending good articles to articles.
+
+        Only as many URLs as there are articles still wanted are fetched, so
+        nothing is marked done in the frontier and then dropped.
+        """
+        urls = urls[: max_articles - len(articles)]
+        results = await asyncio.gather(
+            *(self.fetch_article(url, site) for url in urls)
+        )
+        for article in results:
+            if article and len(article.get("content", "")) > 200:
+                articles.append(article)
+
+    async def crawl(self, sites, max_articles=50):
+        """Crawl every site concurrently; returns {site: articles}"""
+        results = await asyncio.gather(
+            *(self.crawl_site(site, max_articles) for site in sites)
+        )
+        return dict(zip(sites, results))
+
+
+async def run(args, frontier=None, store=None, extractor=None):
+    async with AsyncKhmerCrawler(
+        concurrency=args.concurrency,
+        per_host_rate=args.rate,
+        burst=args.burst,
+        timeout=args.timeout,
+        frontier=frontier,
+        recheck=args.recheck,
+        store=store,
+        extractor=extractor,
+    ) as crawler:
+        results = await crawler.crawl(args.sites, args.max_articles)
+
+    for site, articles in results.items():
+        print(f"{site}: {len(articles)} articles")
+    return [article for articles in results.values() for article in articles]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Crawl several Khmer news sites concurrently"
+    )
+    parser.add_argument(
+        "sites",
+        nargs="*",
+        default=[
+            "https://www.khmerload.com/",
+            "https://www.sabay.com.kh/",
+            "https://www.cambodiadaily.com/kh/",
+        ],
+        help="listing page URLs to start from",
+    )
+    parser.add_argument(
+        "--max-articles", type=int, default=20, help="articles to collect per site"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="open connections across all sites"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=0.5, help="requests per second per host"
+    )
+    parser.add_argument(
+        "--burst", type=int, default=1, help="requests a host may receive back to back"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=15, help="seconds per request"
+    )
+    parser.add_argument(
+        "--frontier",
+        default="crawl_frontier.sqlite3",
+        help="SQLite file recording crawled URLs across runs",
+    )
+    parser.add_argument(
+        "--no-frontier",
+        action="store_true",
+        help="crawl everything from scratch without recording state",
+    )
+    parser.add_argument(
+        "--recheck",
+        action="store_true",
+        help="revalidate previously crawled articles with conditional GETs",
+    )
+    parser.add_argument(
+        "--output",
+        default="khmer_articles.jsonl",
+        help="JSONL article store to append to (.gz / .zst to compress)",
+    )
+    parser.add_argument("--corpus", default="khmer_corpus.txt")
+    parser.add_argument(
+        "--fast-extract",
+        action="store_true",
+        help="extract with lxml and learned per-site profiles instead of BeautifulSoup",
+    )
+    parser.add_argument("--profiles", default="extraction_profiles.json")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    frontier = None if args.no_frontier else CrawlFrontier(args.frontier)
+    extractor = None
+    if args.fast_extract:
+        from page_extractor import FastExtractor, ExtractionProfiles
+
+        extractor = FastExtractor(ExtractionProfiles(path=args.profiles))
+
+    with ArticleStore(args.output) as store:
+        articles = asyncio.run(run(args, frontier, store, extractor))
+
+    if extractor is not None:
+        extractor.profiles.save()
+
+    if frontier is not None:
+        print(f"Frontier: {frontier.stats()}")
+        frontier.close()
+
+    if articles:
+        scraper = WorkingKhmerScraper()
+        scraper.print_summary(articles, args.output)
+        scraper.export_text_only(args.output, args.corpus)
+    else:
+        print("\n❌ No articles were collected.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import sqlite3
+import hashlib
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    site TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    discovered_at REAL,
+    fetched_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_site_status ON urls (site, status);
+"""
+
+
+def content_hash(content):
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+
+class CrawlFrontier:
+    """Persistent crawl state in a local SQLite file.
+
+    Every article URL a scraper discovers is recorded once with its status
+    ('pending', 'done' or 'failed'). Fetch results store the response
+    validators (ETag / Last-Modified) and a hash of the extracted text.
+    Each update commits straight away, so an interrupted crawl resumes
+    from its pending URLs. A later run skips finished URLs, or revalidates them with
+    a conditional GET when asked to recheck.
+    """
+
+    def __init__(self, path="crawl_frontier.sqlite3"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def add(self, urls, site=None):
+        """Record newly discovered URLs; returns how many were new"""
+        now = time.time()
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, site, discovered_at) VALUES (?, ?, ?)",
+                [(url, site, now) for url in urls],
+            )
+        return cursor.rowcount
+
+    def pending(self, site=None, max_attempts=3):
+        """URLs still to fetch (including failures worth retrying), oldest first"""
+        query = (
+            "SELECT url FROM urls WHERE (status = 'pending' OR "
+            "(status = 'failed' AND attempts < ?))"
+        )
+        params = [max_attempts]
+        if site is not None:
+            query += " AND site = ?"
+            params.append(site)
+        query += " ORDER BY discovered_at"
+        return [row[0] for row in self.conn.execute(query, params)]
+
+    def select(self, urls, recheck=False, max_attempts=3):
+        """Subset of urls that should be fetched this run"""
+        selected = []
+        for url in urls:
+            row = self.conn.execute(
+                "SELECT status, attempts FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None or row[0] == "pending":
+                selected.append(url)
+            elif row[0] == "failed" and row[1] < max_attempts:
+                selected.append(url)
+            elif row[0] == "done" and recheck:
+                selected.append(url)
+        return selected
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since headers for a known URL"""
+        row = self.conn.execute(
+            "SELECT etag, last_modified FROM urls WHERE url = ?", (url,)
+        ).fetchone()
+        headers = {}
+        if row:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def has_changed(self, url, content):
+        """True if content differs from what the last successful fetch of
+        url extracted (or url was never fetched)"""
+        row = self.conn.execute(
+            "SELECT content_hash FROM urls WHERE url = ?", (url,)
+        ).fetchone()
+        return row is None or row[0] != content_hash(content)
+
+    def record_fetch(self, url, status_code, content=None, headers=None, site=None):
+        """Store the outcome of fetching url; returns True if the content is
+        new or changed since the last successful fetch.
+
+        content is the extracted article text rather than the raw page, so
+        rotating ads or timestamps do not count as changes. site is recorded
+        for URLs not seen before, so pending(site=...) can retry them.
+        """
+        now = time.time()
+        headers = headers or {}
+
+        if status_code == 304:
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE urls SET status = 'done', fetched_at = ? WHERE url = ?",
+                    (now, url),
+                )
+            return False
+
+        if status_code != 200:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO urls (url, site, status, attempts, discovered_at, fetched_at) "
+                    "VALUES (?, ?, 'failed', 1, ?, ?) ON CONFLICT(url) DO UPDATE SET "
+                    "site = COALESCE(site, excluded.site), "
+                    "status = 'failed', attempts = attempts + 1, fetched_at = excluded.fetched_at",
+                    (url, site, now, now),
+                )
+            return False
+
+        changed = self.has_changed(url, content)
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO urls (url, site, status, etag, last_modified, content_hash, "
+                "attempts, discovered_at, fetched_at) VALUES (?, ?, 'done', ?, ?, ?, 1, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET site = COALESCE(site, excluded.site), "
+                "status = 'done', etag = excluded.etag, "
+                "last_modified = excluded.last_modified, "
+                "content_hash = excluded.content_hash, attempts = attempts + 1, "
+                "fetched_at = excluded.fetched_at",
+                (
+                    url,
+                    site,
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                    content_hash(content),
+                    now,
+                    now,
+                ),
+            )
+        return changed
+
+    def stats(self):
+        return dict(
+            self.conn.execute("SELECT status, COUNT(*) FROM urls GROUP BY status")
+        )
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from collections import defaultdict
+
+from aiohttp import web
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from async_crawler import AsyncKhmerCrawler
+from crawl_frontier import CrawlFrontier
+
+ARTICLE_BODY = "<p>" + "ខ្ញុំទៅសាលារៀន " * 40 + "</p>"
+
+
+class FixtureSite:
+    """Local news site: listing pages at /?page=N linking to
+    `per_page` articles each, with every request's time recorded per Host
+    header"""
+
+    def __init__(self, pages=3, per_page=6):
+        self.pages = pages
+        self.per_page = per_page
+        self.requests = defaultdict(list)
+
+    def app(self):
+        app = web.Application()
+        app.router.add_get("/", self.listing)
+        app.router.add_get("/news/{page}/{i}/story", self.article)
+        return app
+
+    def record(self, request):
+        self.requests[request.host].append(time.monotonic())
+
+    async def listing(self, request):
+        self.record(request)
+        page = int(request.query.get("page", 1))
+        if page > self.pages:
+            return web.Response(status=404)
+        links = "".join(
+            f'<h2><a href="/news/{page}/{i}/story">ព័ត៌មាន {page}-{i}</a></h2>'
+            for i in range(self.per_page)
+        )
+        return web.Response(
+            text=f"<html><body>{links}</body></html>", content_type="text/html"
+        )
+
+    async def article(self, request):
+        self.record(request)
+        etag = '"{page}-{i}"'.format(**request.match_info)
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304)
+        return web.Response(
+            text=f"<html><body><article>{ARTICLE_BODY}</article></body></html>",
+            content_type="text/html",
+            headers={"ETag": etag},
+        )
+
+
+def fastest_rate(times, window):
+    """Most requests seen in any `window` seconds"""
+    best = 0
+    start = 0
+    for end in range(len(times)):
+        while times[end] - times[start] > window:
+            start += 1
+        best = max(best, end - start + 1)
+    return best
+
+
+async def crawl(sites, args, frontier=None):
+    async with AsyncKhmerCrawler(
+        per_host_rate=args.rate, burst=args.burst, frontier=frontier
+    ) as crawler:
+        return await crawler.crawl(sites, args.max_articles)
+
+
+async def run_checks(args):
+    fixture = FixtureSite()
+    runner = web.AppRunner(fixture.app())
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    # Two host names for the same server, so each gets its own bucket
+    sites = [f"http://127.0.0.1:{port}/", f"http://localhost:{port}/"]
+
+    failures = []
+
+    def check(ok, message):
+        print(f"  {'ok  ' if ok else 'FAIL'} {message}")
+        if not ok:
+            failures.append(message)
+
+    fd, frontier_path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(fd)
+    try:
+        print(f"Crawling {', '.join(sites)}")
+        frontier = CrawlFrontier(frontier_path)
+        started = time.monotonic()
+        results = await crawl(sites, args, frontier)
+        seconds = time.monotonic() - started
+
+        for url, articles in results.items():
+            check(
+                len(articles) == args.max_articles,
+                f"{url}: {len(articles)} of {args.max_articles} articles",
+            )
+            urls = [article["url"] for article in articles]
+            check(len(set(urls)) == len(urls), f"{url}: no article fetched twice")
+
+        # Tokens refill continuously, so allow one extra request per window
+        allowed = args.burst + args.rate + 1
+        for host, times in sorted(fixture.requests.items()):
+            peak = fastest_rate(times, 1.0)
+            check(
+                peak <= allowed,
+                f"{host}: {len(times)} requests, at most {peak} in any second "
+                f"(limit {allowed:g})",
+            )
+
+        expected = (args.max_articles + 1 - args.burst) / args.rate
+        check(
+            seconds < 2 * expected,
+            f"hosts crawled concurrently ({seconds:.1f}s, one host alone "
+            f"needs about {expected:.1f}s)",
+        )
+
+        print("Crawling again with the same frontier")
+        before = {host: len(times) for host, times in fixture.requests.items()}
+        again = await crawl(sites, args, frontier)
+        for url, articles in again.items():
+            first = {article["url"] for article in results[url]}
+            repeats = [article["url"] for article in articles if article["url"] in first]
+            check(not repeats, f"{url}: {len(repeats)} finished articles refetched")
+        extra = sum(len(times) - before.get(host, 0) for host, times in fixture.requests.items())
+        print(f"  second run made {extra} requests; frontier: {frontier.stats()}")
+        frontier.close()
+    finally:
+        os.remove(frontier_path)
+        await runner.cleanup()
+
+    return failures
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run AsyncKhmerCrawler against a local fixture site and "
+        "check article counts and per-host rate limits"
+    )
+    parser.add_argument("--max-articles", type=int, default=8)
+    parser.add_argument(
+        "--rate", type=float, default=4, help="requests per second per host"
+    )
+    parser.add_argument("--burst", type=int, default=2)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    failures = asyncio.run(run_checks(args))
+    if failures:
+        print(f"\n❌ {len(failures)} check(s) failed")
+        sys.exit(1)
+    print("\n✅ All crawler checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import sys
+import glob
+import time
+import argparse
+from multiprocessing import Pool
+
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from sc import WorkingKhmerScraper
+from page_extractor import FastExtractor, ExtractionProfiles
+from src.preprocessing.article_store import ArticleStore
+
+# One scraper per worker process, created by init_worker
+worker_scraper = None
+
+
+def init_worker(profiles_path):
+    global worker_scraper
+    profiles = ExtractionProfiles(path=profiles_path)
+    worker_scraper = WorkingKhmerScraper(extractor=FastExtractor(profiles))
+
+
+def extract_page(item):
+    url, path = item
+    with open(path, "rb") as f:
+        return worker_scraper.parse_article(url, f.read())
+
+
+def list_pages(pages_dir):
+    """(url, path) for every saved page; the first directory level under
+    pages_dir is the site's domain"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(pages_dir, "*", "**", "*.htm*"), recursive=True)):
+        relative = os.path.relpath(path, pages_dir).replace(os.sep, "/")
+        pages.append((f"https://{relative}", path))
+    return pages
+
+
+def learn_profiles(pages, profiles):
+    """Run the full selector search on the first pages of each domain until
+    every domain has a profile"""
+    extractor = FastExtractor(profiles)
+    seen = {}
+    for url, path in pages:
+        domain = url.split("/")[2]
+        if seen.get(domain, 0) >= profiles.samples:
+            continue
+        seen[domain] = seen.get(domain, 0) + 1
+        with open(path, "rb") as f:
+            extractor.extract(url, f.read())
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Extract Khmer articles from saved HTML pages "
+        "(pages_dir/<domain>/.../*.html)"
+    )
+    parser.add_argument("pages_dir")
+    parser.add_argument("--output", default="khmer_articles.jsonl")
+    parser.add_argument(
+        "--profiles",
+        default="extraction_profiles.json",
+        help="JSON file of learned per-domain content selectors",
+    )
+    parser.add_argument(
+        "--samples", type=int, default=3, help="pages per domain used to learn a profile"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    pages = list_pages(args.pages_dir)
+    print(f"Found {len(pages)} saved pages")
+
+    profiles = ExtractionProfiles(samples=args.samples, path=args.profiles)
+    learn_profiles(pages, profiles)
+    profiles.save()
+    for domain, selector in sorted(profiles.selectors.items()):
+        print(f"  {domain}: {selector}")
+
+    started = time.perf_counter()
+    saved = 0
+    with ArticleStore(args.output) as store:
+        if args.workers > 1:
+            with Pool(
+                args.workers, initializer=init_worker, initargs=(args.profiles,)
+            ) as pool:
+                articles = pool.imap(extract_page, pages, chunksize=64)
+                for article in articles:
+                    if article:
+                        store.append(article)
+                        saved += 1
+        else:
+            init_worker(args.profiles)
+            for item in pages:
+                article = extract_page(item)
+                if article:
+                    store.append(article)
+                    saved += 1
+
+    seconds = time.perf_counter() - started
+    rate = len(pages) / seconds if seconds else float("inf")
+    print(f"Saved {saved} articles to {args.output} ({rate:,.0f} pages/s)")
+
+
+if __name__ == "__main__":
+    main()
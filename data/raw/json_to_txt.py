@@ -1,16 +1,45 @@
+import os
+import sys
 import json
+import argparse
 
-# Read the JSON file
-with open("khmer_articles.json", "r", encoding="utf-8") as f:
-    data = json.load(f)
-
-# Create a text file
-with open("khmer_articles.txt", "w", encoding="utf-8") as f:
-    for article in data:
-        f.write(f"Title: {article['title']}\n")
-        f.write(f"URL: {article['url']}\n")
-        f.write(f"Length: {article['length']} characters\n")
-        f.write(f"Source: {article['source']}\n")
-        f.write("Content:\n")
-        f.write(article["content"])
-        f.write("\n" + "=" * 80 + "\n\n")
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from src.preprocessing.article_store import iter_articles
+
+
+def read_articles(path):
+    """Stream records from a JSONL store; legacy .json dumps are loaded whole"""
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f)
+    else:
+        yield from iter_articles(path, latest_only=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert a scraped article store to separator-delimited text"
+    )
+    parser.add_argument("input", nargs="?", default="khmer_articles.jsonl")
+    parser.add_argument("output", nargs="?", default="khmer_articles.txt")
+    args = parser.parse_args()
+
+    count = 0
+    with open(args.output, "w", encoding="utf-8") as f:
+        for article in read_articles(args.input):
+            f.write(f"Title: {article['title']}\n")
+            f.write(f"URL: {article['url']}\n")
+            f.write(f"Length: {article['length']} characters\n")
+            f.write(f"Source: {article['source']}\n")
+            f.write("Content:\n")
+            f.write(article["content"])
+            f.write("\n" + "=" * 80 + "\n\n")
+            count += 1
+    print(f"Wrote {count} articles to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
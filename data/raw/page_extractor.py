@@ -0,0 +1,180 @@
+import os
+import json
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+from lxml import etree
+from lxml import html as lxml_html
+
+# Tags WorkingKhmerScraper.extract_content decomposes before reading text
+NOISE_TAGS = (
+    "script",
+    "style",
+    "nav",
+    "footer",
+    "header",
+    "aside",
+    "form",
+    "button",
+    "iframe",
+)
+MIN_CONTENT_LENGTH = 300
+MIN_TITLE_LENGTH = 10
+
+UTF8_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+
+
+def has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# WorkingKhmerScraper's CSS selectors, in the same order, compiled to XPath
+CONTENT_SELECTORS = {
+    "article .entry-content": f"//article//*[{has_class('entry-content')}]",
+    "article .post-content": f"//article//*[{has_class('post-content')}]",
+    "div.entry-content": f"//div[{has_class('entry-content')}]",
+    "div.post-content": f"//div[{has_class('post-content')}]",
+    "div.article-content": f"//div[{has_class('article-content')}]",
+    "div.content": f"//div[{has_class('content')}]",
+    "div.story-content": f"//div[{has_class('story-content')}]",
+    "article": "//article",
+    "main": "//main",
+    "div.main-content": f"//div[{has_class('main-content')}]",
+    ".post": f"//*[{has_class('post')}]",
+    ".article-body": f"//*[{has_class('article-body')}]",
+    "body": "//body",
+}
+TITLE_SELECTORS = {
+    "h1.entry-title": f"//h1[{has_class('entry-title')}]",
+    "h1.title": f"//h1[{has_class('title')}]",
+    "h1.post-title": f"//h1[{has_class('post-title')}]",
+    "h1.article-title": f"//h1[{has_class('article-title')}]",
+    "h1.headline": f"//h1[{has_class('headline')}]",
+    "h1": "//h1",
+    ".post h1": f"//*[{has_class('post')}]//h1",
+    ".article h1": f"//*[{has_class('article')}]//h1",
+    "header h1": "//header//h1",
+    "title": "//title",
+}
+CONTENT_XPATHS = {name: etree.XPath(xpath) for name, xpath in CONTENT_SELECTORS.items()}
+TITLE_XPATHS = {name: etree.XPath(xpath) for name, xpath in TITLE_SELECTORS.items()}
+
+
+def node_text(element, separator=" "):
+    """Text of element like BeautifulSoup's get_text(separator, strip=True)"""
+    pieces = (piece.strip() for piece in element.itertext())
+    return separator.join(piece for piece in pieces if piece)
+
+
+def select_text(root, name, separator=" "):
+    matches = CONTENT_XPATHS[name](root)
+    return node_text(matches[0], separator) if matches else None
+
+
+class ExtractionProfiles:
+    """Content selector per domain, learned from the first `samples` pages
+    of that domain and optionally persisted as JSON.
+
+    Safe to share between threads: the async crawler extracts pages with
+    asyncio.to_thread.
+    """
+
+    def __init__(self, samples=3, path=None):
+        self.samples = samples
+        self.path = path
+        self.selectors = {}
+        self.votes = {}
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.selectors = json.load(f)["selectors"]
+
+    def selector(self, domain):
+        with self.lock:
+            return self.selectors.get(domain)
+
+    def observe(self, domain, name):
+        """Record the selector that won a full search on a sample page"""
+        with self.lock:
+            if domain in self.selectors:
+                return
+            votes = self.votes.setdefault(domain, Counter())
+            votes[name] += 1
+            if sum(votes.values()) >= self.samples:
+                self.selectors[domain] = votes.most_common(1)[0][0]
+                del self.votes[domain]
+
+    def save(self, path=None):
+        path = path or self.path
+        tmp_path = path + ".tmp"
+        with self.lock:
+            selectors = dict(self.selectors)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"selectors": selectors}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+class FastExtractor:
+    """lxml counterpart of WorkingKhmerScraper's extract_title and
+    extract_content.
+
+    A page is parsed once by lxml's C parser, noise is removed with
+    strip_elements, and the text comes from a single itertext walk of the
+    chosen node. Once a domain has a learned profile, its selector is
+    tried first and the full selector search only runs if it comes up
+    short.
+    """
+
+    def __init__(self, profiles=None):
+        self.profiles = profiles or ExtractionProfiles()
+        self.profile_hits = 0
+        self.profile_misses = 0
+
+    def extract(self, url, page):
+        """(title, content text) of an HTML page given as bytes or str"""
+        try:
+            if isinstance(page, bytes):
+                root = lxml_html.document_fromstring(page, parser=UTF8_PARSER)
+            else:
+                root = lxml_html.document_fromstring(page)
+        except (etree.ParserError, ValueError):
+            return "", ""
+
+        title = self.extract_title(root)
+        etree.strip_elements(root, etree.Comment, *NOISE_TAGS, with_tail=False)
+        return title, self.extract_content(urlsplit(url).netloc, root)
+
+    def extract_title(self, root):
+        for xpath in TITLE_XPATHS.values():
+            matches = xpath(root)
+            if matches:
+                title = node_text(matches[0], "")
+                if title and len(title) > MIN_TITLE_LENGTH:
+                    return title
+        matches = TITLE_XPATHS["title"](root)
+        return node_text(matches[0], "") if matches else ""
+
+    def search_content(self, root):
+        """First selector (in scraper order) with enough text, else body"""
+        for name in CONTENT_XPATHS:
+            if name == "body":
+                break
+            text = select_text(root, name)
+            if text is not None and len(text) > MIN_CONTENT_LENGTH:
+                return name, text
+        return "body", select_text(root, "body") or ""
+
+    def extract_content(self, domain, root):
+        name = self.profiles.selector(domain)
+        if name is not None:
+            text = select_text(root, name)
+            if text is not None and (name == "body" or len(text) > MIN_CONTENT_LENGTH):
+                self.profile_hits += 1
+                return text
+            self.profile_misses += 1
+            return self.search_content(root)[1]
+
+        name, text = self.search_content(root)
+        self.profiles.observe(domain, name)
+        return text
@@ -1,14 +1,23 @@
 import requests
 from bs4 import BeautifulSoup
-import json
+import os
+import sys
 import time
 import re
+import argparse
 from urllib.parse import urljoin
 import random
 
+sys.path.append(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from crawl_frontier import CrawlFrontier
+from src.preprocessing.article_store import ArticleStore, iter_articles
+
 
 class WorkingKhmerScraper:
-    def __init__(self):
+    def __init__(self, frontier=None, recheck=False, store=None, extractor=None):
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -21,24 +30,34 @@ class WorkingKhmerScraper:
         self.session = requests.Session()
         self.session.headers.update(self.headers)
         self.khmer_pattern = re.compile(r"[\u1780-\u17FF\s]+")
+        # Optional CrawlFrontier: skip URLs finished in earlier runs (or
+        # revalidate them with conditional GETs when recheck is set)
+        self.frontier = frontier
+        self.recheck = recheck
+        # Optional ArticleStore that receives each article as it is scraped
+        self.store = store
+        # Optional page_extractor.FastExtractor replacing the BeautifulSoup
+        # title/content extraction in parse_article
+        self.extractor = extractor
 
     def scrape_khmer_news(self, url, max_articles=50):
         """Scrape Khmer news from a single website"""
         articles = []
+        visited = set()
         page = 1
 
         print(f"Starting to scrape: {url}")
 
+        if self.frontier is not None:
+            # Finish what an interrupted run left behind first
+            resumed = self.frontier.pending(site=url)
+            if resumed:
+                print(f"  Resuming {len(resumed)} pending articles")
+                self.scrape_articles(resumed, articles, max_articles, url)
+
         while len(articles) < max_articles:
             try:
-                # For pagination
-                if page > 1:
-                    if "rasmeinews" in url:
-                        current_url = f"{url}page/{page}/"
-                    else:
-                        current_url = f"{url}?page={page}"
-                else:
-                    current_url = url
+                current_url = self.page_url(url, page)
 
                 print(f"Page {page}: {current_url}")
 
@@ -61,24 +80,19 @@ class WorkingKhmerScraper:
 
                 print(f"  Found {len(article_links)} potential articles")
 
-                # Scrape each article
-                for i, article_url in enumerate(
-                    article_links[:10]
-                ):  # Limit to 10 per page
-                    if len(articles) >= max_articles:
-                        break
-
-                    print(
-                        f"    Processing article {i+1}/{len(article_links[:10])}: {article_url}"
-                    )
-                    article_data = self.scrape_article_content(article_url)
-
-                    if article_data and len(article_data.get("content", "")) > 200:
-                        articles.append(article_data)
-                        print(f"      ✓ Added article {len(articles)}")
+                candidates = [link for link in article_links if link not in visited]
+                if self.frontier is not None:
+                    self.frontier.add(article_links, site=url)
+                    candidates = self.frontier.select(candidates, self.recheck)
+                    print(f"  {len(candidates)} new or due for recheck")
+                # Limit to 10 per page, counted after skipping finished links
+                candidates = candidates[:10]
+                if not candidates:
+                    print(f"  Nothing new on page {page}")
+                    break
+                visited.update(candidates)
 
-                    # Random delay to avoid being blocked
-                    time.sleep(random.uniform(1, 3))
+                self.scrape_articles(candidates, articles, max_articles, url)
 
                 # Check if we should continue to next page
                 if not article_links or len(articles) >= max_articles:
@@ -93,6 +107,30 @@ class WorkingKhmerScraper:
 
         return articles
 
+    def scrape_articles(self, urls, articles, max_articles, site=None):
+        """Scrape each URL in turn, appending good articles to articles"""
+        for i, article_url in enumerate(urls):
+            if len(articles) >= max_articles:
+                break
+
+            print(f"    Processing article {i+1}/{len(urls)}: {article_url}")
+            article_data = self.scrape_article_content(article_url, site=site)
+
+            if article_data and len(article_data.get("content", "")) > 200:
+                articles.append(article_data)
+                print(f"      ✓ Added article {len(articles)}")
+
+            # Random delay to avoid being blocked
+            time.sleep(random.uniform(1, 3))
+
+    def page_url(self, url, page):
+        """URL of listing page `page` of a site"""
+        if page == 1:
+            return url
+        if "rasmeinews" in url:
+            return f"{url}page/{page}/"
+        return f"{url}?page={page}"
+
     def find_article_links(self, soup, base_url):
         """Find article links using multiple strategies"""
         links = set()
@@ -203,17 +241,50 @@ class WorkingKhmerScraper:
 
         return True
 
-    def scrape_article_content(self, url):
-        """Scrape content from a single article"""
+    def scrape_article_content(self, url, site=None):
+        """Scrape content from a single article; site is the listing URL it
+        was found on, recorded in the frontier"""
         try:
             print(f"      Fetching: {url}")
-            response = self.session.get(url, timeout=15)
+            headers = {}
+            if self.frontier is not None:
+                headers = self.frontier.conditional_headers(url)
+            response = self.session.get(url, timeout=15, headers=headers)
             response.encoding = "utf-8"
 
             if response.status_code != 200:
+                if self.frontier is not None:
+                    self.frontier.record_fetch(url, response.status_code, site=site)
                 return None
 
-            soup = BeautifulSoup(response.content, "html.parser")
+            article = self.parse_article(url, response.content)
+            content = article["content"] if article else None
+            if self.frontier is not None and not self.frontier.has_changed(url, content):
+                self.frontier.record_fetch(url, 200, content, response.headers, site)
+                print("      Unchanged since last crawl")
+                return None
+
+            # Store before marking the URL done: a crash in between means a
+            # re-fetch next run rather than a lost article
+            if article and self.store is not None:
+                self.store.append(article)
+            if self.frontier is not None:
+                self.frontier.record_fetch(url, 200, content, response.headers, site)
+            return article
+
+        except Exception as e:
+            print(f"      Error scraping article: {str(e)}")
+            if self.frontier is not None:
+                self.frontier.record_fetch(url, None, site=site)
+            return None
+
+    def parse_article(self, url, html):
+        """Build an article record from a downloaded page, or None if it
+        holds too little Khmer text"""
+        if self.extractor is not None:
+            title, content = self.extractor.extract(url, html)
+        else:
+            soup = BeautifulSoup(html, "html.parser")
 
             # Extract title
             title = self.extract_title(soup)
@@ -221,24 +292,20 @@ class WorkingKhmerScraper:
             # Extract content
             content = self.extract_content(soup)
 
-            # Clean and filter Khmer text
-            if content:
-                khmer_content = self.extract_khmer_text(content)
-
-                if len(khmer_content) > 200:  # Minimum length
-                    return {
-                        "url": url,
-                        "title": title,
-                        "content": khmer_content,
-                        "length": len(khmer_content),
-                        "source": url,
-                    }
+        # Clean and filter Khmer text
+        if content:
+            khmer_content = self.extract_khmer_text(content)
 
-            return None
+            if len(khmer_content) > 200:  # Minimum length
+                return {
+                    "url": url,
+                    "title": title,
+                    "content": khmer_content,
+                    "length": len(khmer_content),
+                    "source": url,
+                }
 
-        except Exception as e:
-            print(f"      Error scraping article: {str(e)}")
-            return None
+        return None
 
     def extract_title(self, soup):
         """Extract article title"""
@@ -334,10 +401,13 @@ class WorkingKhmerScraper:
         return khmer_text
 
     def save_articles(self, articles, filename):
-        """Save articles to JSON file"""
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(articles, f, ensure_ascii=False, indent=2)
+        """Append articles to a JSONL article store"""
+        with ArticleStore(filename) as store:
+            for article in articles:
+                store.append(article)
+        self.print_summary(articles, filename)
 
+    def print_summary(self, articles, filename):
         total_chars = sum(article["length"] for article in articles)
         print(f"\n✅ Saved {len(articles)} articles to {filename}")
         print(f"📊 Total characters: {total_chars:,}")
@@ -348,16 +418,50 @@ class WorkingKhmerScraper:
             print(f"Title: {articles[0]['title'][:100]}...")
             print(f"Content preview: {articles[0]['content'][:200]}...")
 
-    def export_text_only(self, articles, filename):
-        """Export only the text content for NLP processing"""
+    def export_text_only(self, store_path, filename):
+        """Export only the text content of a store for NLP processing,
+        streaming one article at a time"""
         with open(filename, "w", encoding="utf-8") as f:
-            for article in articles:
+            for article in iter_articles(store_path, latest_only=True):
                 f.write(article["content"] + "\n\n")
         print(f"Exported text to {filename}")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape Khmer news articles")
+    parser.add_argument(
+        "--frontier",
+        default="crawl_frontier.sqlite3",
+        help="SQLite file recording crawled URLs across runs",
+    )
+    parser.add_argument(
+        "--no-frontier",
+        action="store_true",
+        help="crawl everything from scratch without recording state",
+    )
+    parser.add_argument(
+        "--recheck",
+        action="store_true",
+        help="revalidate previously crawled articles with conditional GETs",
+    )
+    parser.add_argument(
+        "--output",
+        default="khmer_articles.jsonl",
+        help="JSONL article store to append to (.gz / .zst to compress)",
+    )
+    parser.add_argument("--corpus", default="khmer_corpus.txt")
+    parser.add_argument(
+        "--fast-extract",
+        action="store_true",
+        help="extract with lxml and learned per-site profiles instead of BeautifulSoup",
+    )
+    parser.add_argument("--profiles", default="extraction_profiles.json")
+    return parser.parse_args()
+
+
 def main():
     """Main function to run the scraper"""
+    args = parse_args()
 
     # List of Khmer websites to scrape
     khmer_sites = [
@@ -370,20 +474,35 @@ def main():
     target_site = khmer_sites[0]
 
     # Initialize scraper
-    scraper = WorkingKhmerScraper()
+    frontier = None if args.no_frontier else CrawlFrontier(args.frontier)
+    extractor = None
+    if args.fast_extract:
+        from page_extractor import FastExtractor, ExtractionProfiles
+
+        extractor = FastExtractor(ExtractionProfiles(path=args.profiles))
 
-    # Scrape articles
+    # Scrape articles, appending each to the store as it arrives
     print(f"🚀 Starting scraper for: {target_site}")
     print("=" * 60)
 
-    articles = scraper.scrape_khmer_news(target_site, max_articles=20)
+    with ArticleStore(args.output) as store:
+        scraper = WorkingKhmerScraper(
+            frontier=frontier, recheck=args.recheck, store=store, extractor=extractor
+        )
+        articles = scraper.scrape_khmer_news(target_site, max_articles=20)
+
+    if extractor is not None:
+        extractor.profiles.save()
+
+    if frontier is not None:
+        print(f"Frontier: {frontier.stats()}")
+        frontier.close()
 
     if articles:
-        # Save results
-        scraper.save_articles(articles, "khmer_articles.json")
+        scraper.print_summary(articles, args.output)
 
         # Export for your stop-word project
-        scraper.export_text_only(articles, "khmer_corpus.txt")
+        scraper.export_text_only(args.output, args.corpus)
 
         print("\n" + "=" * 60)
         print("🎉 Scraping completed successfully!")
@@ -3,6 +3,8 @@ from bs4 import BeautifulSoup
 import time
 import re
 import sys
+import asyncio
+import argparse
 
 # Ensure proper UTF-8 output
 if sys.stdout.encoding != "utf-8":
@@ -78,7 +80,11 @@ def scrape_article_content(article_url):
         print(f"❌ Failed to fetch {article_url}: {e}")
         return ""
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    return parse_article_content(response.text)
+
+
+def parse_article_content(html):
+    soup = BeautifulSoup(html, "html.parser")
 
     # RFA main content selector
     content = soup.select_one("div.content, div.contentblock")
@@ -102,8 +108,34 @@ def scrape_article_content(article_url):
     return ""
 
 
+async def fetch_article_contents(articles, concurrency, rate):
+    """Download and parse every article through the rate-limited async
+    crawler; returns contents in the order of `articles`"""
+    from async_crawler import AsyncKhmerCrawler
+
+    async with AsyncKhmerCrawler(concurrency=concurrency, per_host_rate=rate) as crawler:
+        pages = await asyncio.gather(*(crawler.fetch(art["url"]) for art in articles))
+    return [
+        parse_article_content(page.decode("utf-8", errors="replace")) if page else ""
+        for page in pages
+    ]
+
+
 # Main execution
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="fetch articles with the async crawler instead of one at a time",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--rate", type=float, default=1 / 1.5, help="requests per second (async mode)"
+    )
+    args = parser.parse_args()
+
     print("📡 Fetching real Khmer news articles from RFA (for stop-word corpus)...\n")
     articles = scrape_rfa_khmer_article_links()
 
@@ -111,6 +143,12 @@ if __name__ == "__main__":
         print("⚠️ No valid news articles found.")
         sys.exit(1)
 
+    contents = None
+    if args.use_async:
+        contents = asyncio.run(
+            fetch_article_contents(articles, args.concurrency, args.rate)
+        )
+
     all_text = []
     saved_count = 0
 
@@ -118,7 +156,10 @@ if __name__ == "__main__":
         print(f"{i}. {art['title']}")
         print(f"   🔗 {art['url']}")
 
-        content = scrape_article_content(art["url"])
+        if contents is not None:
+            content = contents[i - 1]
+        else:
+            content = scrape_article_content(art["url"])
         if content and len(content) > 300:  # Only use long articles
             all_text.append(content)
             saved_count += 1
@@ -126,7 +167,8 @@ if __name__ == "__main__":
         else:
             print("   ❌ Skipped (too short or no content).")
 
-        time.sleep(1.5)  # Be respectful
+        if contents is None:
+            time.sleep(1.5)  # Be respectful
 
     # Save full corpus
     if all_text:
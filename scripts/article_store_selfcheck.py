@@ -0,0 +1,105 @@
+import os
+import sys
+import tempfile
+from multiprocessing import Process
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.preprocessing.article_store import (
+    ArticleStore,
+    iter_articles,
+    open_text,
+    record_compressor,
+)
+
+FORMATS = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+
+
+def article(n):
+    return {"url": f"https://example.com/{n}", "content": "ខ្ញុំទៅសាលារៀន " * 20}
+
+
+def append_and_die(path, first, count):
+    """Append records and exit without closing anything, like a killed
+    scrape"""
+    store = ArticleStore(path)
+    for n in range(first, first + count):
+        store.append(article(n))
+    os._exit(0)
+
+
+def stream_and_die(path, first, count):
+    """Same, with the single-stream writer older stores were written with"""
+    f = open_text(path, "a")
+    for n in range(first, first + count):
+        f.write(f'{{"url": "https://example.com/{n}", "content": "ក"}}\n')
+        f.flush()
+    os._exit(0)
+
+
+def run_child(target, *args):
+    child = Process(target=target, args=args)
+    child.start()
+    child.join()
+
+
+def killed_after_appends(path):
+    run_child(append_and_die, path, 0, 3)
+    return 3
+
+
+def killed_mid_record(path):
+    with ArticleStore(path) as store:
+        store.append(article(0))
+        store.append(article(1))
+    data = ('{"url": "https://example.com/2", "content": "' + "ក" * 50).encode("utf-8")
+    compress = record_compressor(path)
+    if compress is not None:
+        data = compress(data)
+    with open(path, "ab") as f:
+        f.write(data[: len(data) // 2])
+    return 2
+
+
+def killed_streaming_writer(path):
+    run_child(stream_and_die, path, 0, 3)
+    return 3
+
+
+SCENARIOS = (
+    ("killed after appends", killed_after_appends),
+    ("killed mid-record", killed_mid_record),
+    ("killed streaming writer", killed_streaming_writer),
+)
+
+
+def main():
+    failures = 0
+    directory = tempfile.mkdtemp()
+    for suffix in FORMATS:
+        for name, crash in SCENARIOS:
+            path = os.path.join(directory, name.replace(" ", "_") + suffix)
+            survived = crash(path)
+            # The next run appends one more record
+            with ArticleStore(path) as store:
+                store.append(article(99))
+            try:
+                urls = [record["url"] for record in iter_articles(path)]
+                ok = len(urls) == survived + 1 and urls[-1].endswith("/99")
+                detail = f"{len(urls)} records read, expected {survived + 1}"
+            except Exception as e:
+                ok = False
+                detail = f"{type(e).__name__}: {e}"
+            print(f"  {'ok  ' if ok else 'FAIL'} {suffix:<10} {name}: {detail}")
+            failures += not ok
+            os.remove(path)
+    os.rmdir(directory)
+
+    if failures:
+        print(f"\n❌ {failures} check(s) failed")
+        sys.exit(1)
+    print("\n✅ All article store checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+import argparse
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.demo_stopword_removal import KhmerStopwordRemover
+from src.preprocessing.text_loader import iter_corpus
+import yaml
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare the stopword automaton fast path with CRF segmentation"
+    )
+    parser.add_argument(
+        "--docs", type=int, default=50, help="number of raw articles to use"
+    )
+    return parser.parse_args()
+
+
+def run(remover, texts):
+    started = time.perf_counter()
+    analyses = [remover.analyze(text) for text in texts]
+    return analyses, time.perf_counter() - started
+
+
+def agreement(reference, candidate):
+    """Precision/recall of candidate's removed tokens against reference's"""
+    matched = removed_ref = removed_cand = 0
+    for ref, cand in zip(reference, candidate):
+        ref_removed = Counter(ref["removed"])
+        cand_removed = Counter(cand["removed"])
+        matched += sum((ref_removed & cand_removed).values())
+        removed_ref += sum(ref_removed.values())
+        removed_cand += sum(cand_removed.values())
+    precision = matched / removed_cand if removed_cand else 0.0
+    recall = matched / removed_ref if removed_ref else 0.0
+    return precision, recall
+
+
+def main():
+    args = parse_args()
+
+    with open("config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+
+    texts = []
+    for _, text in iter_corpus(config["data_paths"]["raw_dir"], split_articles=True):
+        texts.append(text)
+        if len(texts) >= args.docs:
+            break
+    chars = sum(len(text) for text in texts)
+    print(f"Benchmarking {len(texts)} documents ({chars:,} characters)\n")
+
+    reference, reference_seconds = run(KhmerStopwordRemover(fast_mode="off"), texts)
+
+    print(f"{'mode':>6} {'seconds':>9} {'speedup':>8} {'precision':>10} {'recall':>7}")
+    print(f"{'off':>6} {reference_seconds:>9.3f} {1.0:>8.1f} {1.0:>10.3f} {1.0:>7.3f}")
+    for mode in ("crf", "none"):
+        analyses, seconds = run(KhmerStopwordRemover(fast_mode=mode), texts)
+        precision, recall = agreement(reference, analyses)
+        speedup = reference_seconds / seconds if seconds else float("inf")
+        print(f"{mode:>6} {seconds:>9.3f} {speedup:>8.1f} {precision:>10.3f} {recall:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.stopword_detection.stopword_artifact import build_artifact
+import yaml
+
+
+def main():
+    with open("config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+
+    stopwords_dir = config["data_paths"]["stopwords_dir"]
+    list_path = os.path.join(stopwords_dir, "final_stopword_list.txt")
+    freq_path = os.path.join(stopwords_dir, "frequency_candidates.txt")
+    output_path = os.path.join(stopwords_dir, "final_stopword_list.bin")
+
+    with open(list_path, "r", encoding="utf-8") as f:
+        words = [line.strip() for line in f if line.strip()]
+
+    ratios = {}
+    if os.path.exists(freq_path):
+        with open(freq_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) >= 2:
+                    ratios[parts[0]] = float(parts[1])
+
+    checksum = build_artifact(words, output_path, ratios)
+    print(f"Compiled {len(set(words))} stopwords to {output_path}")
+    print(f"Checksum: {checksum}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import sys
+import os
+import re
+import argparse
+import tempfile
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.preprocessing.text_loader import iter_corpus, iter_article_stores
+from src.preprocessing.article_store import ArticleStore
+from src.preprocessing.near_duplicates import NearDuplicateIndex
+import yaml
+
+BLANK_LINES = re.compile(r"\n\s*\n")
+TOP_CLUSTERS = 10
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Drop near-duplicate articles before segmentation"
+    )
+    parser.add_argument(
+        "--store",
+        action="append",
+        default=[],
+        help="read articles from this JSONL article store instead of raw_dir; "
+        "may be repeated",
+    )
+    parser.add_argument(
+        "--split-blocks",
+        action="store_true",
+        help="also split documents on blank lines (export_text_only writes "
+        "one article per block)",
+    )
+    parser.add_argument(
+        "--output",
+        default="data/raw/deduplicated_articles.jsonl",
+        help="JSONL article store receiving the unique articles; replaced on "
+        "every run",
+    )
+    parser.add_argument(
+        "--report",
+        default=None,
+        help="TSV of duplicate, representative, similarity "
+        "(default: processed_dir/duplicate_clusters.tsv)",
+    )
+    parser.add_argument(
+        "--index",
+        default=None,
+        help="SQLite file for the LSH index (default: a temporary file)",
+    )
+    return parser.parse_args()
+
+
+def iter_documents(args, raw_dir):
+    if args.store:
+        documents = iter_article_stores(args.store)
+    else:
+        documents = iter_corpus(raw_dir, split_articles=True)
+    for doc_id, text in documents:
+        if not args.split_blocks:
+            yield doc_id, text
+            continue
+        blocks = [b for b in BLANK_LINES.split(text) if b.strip()]
+        if len(blocks) == 1:
+            yield doc_id, text
+        else:
+            for index, block in enumerate(blocks):
+                yield f"{doc_id}_{index:05d}", block
+
+
+def main():
+    args = parse_args()
+
+    with open("config/config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+
+    dedup_config = config.get("deduplication", {})
+    raw_dir = config["data_paths"]["raw_dir"]
+    processed_dir = config["data_paths"]["processed_dir"]
+    report_path = args.report or os.path.join(processed_dir, "duplicate_clusters.tsv")
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+
+    index_path = args.index
+    if index_path is None:
+        fd, index_path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+
+    index = NearDuplicateIndex(
+        num_perm=dedup_config.get("num_perm", 128),
+        bands=dedup_config.get("bands", 16),
+        shingle_size=dedup_config.get("shingle_size", 5),
+        threshold=dedup_config.get("threshold", 0.8),
+        path=index_path,
+    )
+
+    # This is a stage output, not a crawl log: write it fresh and swap it in
+    # at the end, so no record from an earlier run survives. The temporary
+    # name keeps the extension, which selects the compression.
+    output_dir, output_name = os.path.split(args.output)
+    tmp_output = os.path.join(output_dir, f"tmp-{os.getpid()}-{output_name}")
+
+    total = duplicates = 0
+    cluster_sizes = Counter()
+    try:
+        with ArticleStore(tmp_output) as store, open(
+            report_path, "w", encoding="utf-8"
+        ) as report:
+            report.write("duplicate\trepresentative\tsimilarity\n")
+            for doc_id, text in iter_documents(args, raw_dir):
+                total += 1
+                match = index.add(doc_id, text)
+                if match is None:
+                    store.append(
+                        {
+                            "url": doc_id,
+                            "title": "",
+                            "content": text,
+                            "length": len(text),
+                            "source": doc_id,
+                        }
+                    )
+                    continue
+                representative, similarity = match
+                duplicates += 1
+                cluster_sizes[representative] += 1
+                report.write(f"{doc_id}\t{representative}\t{similarity:.3f}\n")
+        os.replace(tmp_output, args.output)
+    finally:
+        index.close()
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+        if args.index is None:
+            os.remove(index_path)
+
+    print(f"Documents: {total}")
+    print(f"Near duplicates dropped: {duplicates}")
+    print(f"Unique documents written to {args.output}: {total - duplicates}")
+    print(f"Duplicate clusters: {len(cluster_sizes)} (report: {report_path})")
+    for representative, count in cluster_sizes.most_common(TOP_CLUSTERS):
+        print(f"  {count + 1:>4} copies  {representative}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,168 @@
 import sys
 import os
+import threading
+import time
 from collections import Counter
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
 
 from src.segmentation.segmenter_interface import KhmerSegmenter
+from src.segmentation.segment_cache import SegmentCache
+from src.segmentation.stopword_trie import StopwordTrie
 from src.preprocessing.unicode_normalizer import normalize_text
+from src.stopword_detection.stopword_artifact import StopwordArtifact, stopword_checksum
 import yaml
 
 
+FAST_MODES = ("off", "crf", "none")
+
+
+def resolve_path(path):
+    """path as given if it exists from the working directory, otherwise
+    relative to the project root, so the remover works from any cwd"""
+    if os.path.isabs(path) or os.path.exists(path):
+        return path
+    return os.path.join(PROJECT_ROOT, path)
+
+
+class ActiveStopwords:
+    """A loaded stopword list and everything derived from it. Reloads
+    replace the whole object, so a request never mixes two lists."""
+
+    def __init__(self, path, stopwords, trie, mtime):
+        self.path = path
+        self.stopwords = stopwords
+        self.trie = trie
+        self.mtime = mtime
+        self.checksum = getattr(stopwords, "checksum", None) or stopword_checksum(
+            stopwords
+        )
+
+
 class KhmerStopwordRemover:
-    def __init__(self, stopwords_path="data/stopwords/final_stopword_list.txt"):
-        self.segmenter = KhmerSegmenter()
-        self.stopwords = self.load_stopwords(stopwords_path)
+    def __init__(
+        self,
+        stopwords_path=None,
+        config_path="config/config.yaml",
+        fast_mode=None,
+    ):
+        config_path = resolve_path(config_path)
+        if os.path.exists(config_path):
+            with open(config_path, "r") as f:
+                self.config = yaml.safe_load(f) or {}
+        else:
+            print(f"No config at {config_path}, using defaults")
+            self.config = {}
+        removal_config = self.config.get("stopword_removal", {})
+        if stopwords_path is None:
+            stopwords_path = removal_config.get(
+                "stopwords_path", "data/stopwords/final_stopword_list.txt"
+            )
+        stopwords_path = resolve_path(stopwords_path)
+        self.segmenter = self.build_segmenter(self.config.get("segmentation", {}))
+
+        # "off": CRF only; "crf": stopword automaton, CRF for the spans in
+        # between; "none": automaton only, other spans split on whitespace
+        if fast_mode is None:
+            fast_mode = removal_config.get("fast_mode", "off")
+        if fast_mode not in FAST_MODES:
+            raise ValueError(f"fast_mode must be one of {FAST_MODES}, got {fast_mode!r}")
+        self.fast_mode = fast_mode
+
+        self.reload_lock = threading.Lock()
+        self.watcher_lock = threading.Lock()
+        self.watcher = None
+        self.active = self.build_active(stopwords_path)
+        if len(self.active.stopwords) == 0:
+            print(f"Warning: no stopwords loaded from {stopwords_path}")
+
+    @property
+    def stopwords(self):
+        return self.active.stopwords
+
+    @property
+    def trie(self):
+        return self.active.trie
+
+    @property
+    def stopwords_path(self):
+        return self.active.path
+
+    @property
+    def stopwords_checksum(self):
+        return self.active.checksum
+
+    def build_active(self, path):
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        stopwords = self.load_stopwords(path)
+        trie = StopwordTrie(stopwords) if self.fast_mode != "off" else None
+        return ActiveStopwords(path, stopwords, trie, mtime)
+
+    def reload_stopwords(self, path=None):
+        """Load a stopword list off the request path and swap it in.
+
+        Raises (leaving the current list in service) if the new list is
+        missing or empty. Returns the checksum of the list now active.
+        """
+        with self.reload_lock:
+            active = self.build_active(path or self.active.path)
+            if len(active.stopwords) == 0:
+                raise ValueError(f"Refusing to load empty stopword list {active.path}")
+            self.active = active
+        return active.checksum
+
+    def watch_stopwords(self, interval):
+        """Poll the list file every interval seconds and reload it when its
+        modification time changes.
+
+        Safe to call on every request: it starts at most one watcher per
+        process, and a forked worker gets its own because the parent's
+        thread does not survive the fork.
+        """
+        with self.watcher_lock:
+            if self.watcher is not None and self.watcher.is_alive():
+                return
+            self.watcher = threading.Thread(
+                target=self.poll_stopwords, args=(interval,),
+                name="stopword-watcher", daemon=True,
+            )
+            self.watcher.start()
+
+    def poll_stopwords(self, interval):
+        failed_mtime = None
+        while True:
+            time.sleep(interval)
+            path = self.active.path
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if mtime in (self.active.mtime, failed_mtime):
+                continue
+            try:
+                checksum = self.reload_stopwords(path)
+                print(f"Reloaded stopwords from {path} ({checksum[:12]})")
+            except Exception as e:
+                failed_mtime = mtime
+                print(f"Stopword reload failed, keeping current list: {e}")
+
+    def build_segmenter(self, seg_config):
+        cache = None
+        if seg_config.get("cache_size"):
+            cache = SegmentCache(
+                max_entries=seg_config["cache_size"],
+                max_bytes=seg_config.get("cache_max_bytes"),
+            )
+        return KhmerSegmenter(max_length=seg_config.get("max_length", 512), cache=cache)
 
     def load_stopwords(self, filepath):
+        # Compiled artifacts (scripts/build_stopword_artifact.py) are
+        # checksum-verified and memory-mapped; lookups still use a
+        # per-process frozenset, and fast_mode builds its own trie
+        if filepath.endswith(".bin"):
+            return StopwordArtifact(filepath)
+
         stopwords = set()
         if os.path.exists(filepath):
             with open(filepath, "r", encoding="utf-8") as f:
@@ -49,6 +197,106 @@ class KhmerStopwordRemover:
         normalized = normalize_text(text)
         return self.segmenter.segment(normalized)
 
+    def stopword_mask(self, tokens, stopwords=None):
+        # True = keep, False = drop; one set lookup per token
+        stopwords = self.stopwords if stopwords is None else stopwords
+        return [token not in stopwords for token in tokens]
+
+    def fast_segment(self, normalized, trie=None):
+        """Tokenize with the stopword automaton (longest match over the raw
+        string), leaving only the spans between stopwords to the CRF.
+
+        In "crf" mode a match needs a word boundary (whitespace,
+        punctuation, text edge) on both sides; stopwords inside the other
+        spans are still found in the CRF's tokens. "none" takes every match
+        on a cluster boundary, including ones inside content words.
+        """
+        trie = self.trie if trie is None else trie
+        tokens = []
+        for span, is_stopword in trie.scan(
+            normalized, word_boundaries=self.fast_mode == "crf"
+        ):
+            if is_stopword:
+                tokens.append(span)
+            elif self.fast_mode == "crf":
+                tokens.extend(self.segmenter.segment(span))
+            else:
+                tokens.extend(span.split())
+        return tokens
+
+    def tokenize(self, normalized, active=None):
+        if self.fast_mode == "off":
+            return self.segmenter.segment(normalized)
+        active = active or self.active
+        return self.fast_segment(normalized, active.trie)
+
+    def analyze(self, text):
+        """Normalize and segment once, then derive every view of the text"""
+        active = self.active
+        return self.analyze_tokens(self.tokenize(normalize_text(text), active), active)
+
+    def analyze_tokens(self, tokens, active=None):
+        """Build the analysis result from already segmented tokens"""
+        active = active or self.active
+        mask = self.stopword_mask(tokens, active.stopwords)
+
+        filtered = []
+        removed = []
+        removed_positions = []
+        for position, (token, keep) in enumerate(zip(tokens, mask)):
+            if keep:
+                filtered.append(token)
+            else:
+                removed.append(token)
+                removed_positions.append(position)
+
+        reduction = (len(removed) / len(tokens) * 100) if tokens else 0
+
+        return {
+            'segmented': tokens,
+            'mask': mask,
+            'filtered': filtered,
+            'removed': removed,
+            'removed_positions': removed_positions,
+            'stopwords_version': active.checksum,
+            'frequency': self.Frequency(filtered),
+            'linguistic': self.linguistic_features(filtered),
+            'stats': {
+                'original_tokens': len(tokens),
+                'filtered_tokens': len(filtered),
+                'removed_tokens': len(removed),
+                'reduction_percentage': round(reduction, 2),
+            },
+        }
+
+    def analyze_many(self, texts):
+        """Analyze a list of documents, segmenting each distinct text once"""
+        active = self.active
+        analyses = []
+        segmented_cache = {}
+        for text in texts:
+            normalized = normalize_text(text)
+            if normalized not in segmented_cache:
+                segmented_cache[normalized] = self.tokenize(normalized, active)
+            analyses.append(self.analyze_tokens(segmented_cache[normalized], active))
+
+        original = sum(a['stats']['original_tokens'] for a in analyses)
+        removed = sum(a['stats']['removed_tokens'] for a in analyses)
+        reduction = (removed / original * 100) if original else 0
+
+        return {
+            'documents': analyses,
+            'stats': {
+                'documents': len(analyses),
+                'unique_documents': len(segmented_cache),
+                'stopwords_version': active.checksum,
+                'original_tokens': original,
+                'filtered_tokens': original - removed,
+                'removed_tokens': removed,
+                'reduction_percentage': round(reduction, 2),
+            },
+        }
+
 
 def main():
     # Sample Khmer texts for demonstration
@@ -68,13 +316,14 @@ def main():
         print(f"--- Sample {i} ---")
         print(f"Original: {text}")
 
-        tokens = remover.segmenter.segment(normalize_text(text))
-        filtered = remover.remove_stopwords(text)
+        analysis = remover.analyze(text)
+        tokens = analysis['segmented']
+        filtered = analysis['filtered']
         removed, ratio = remover.get_stats(tokens, filtered)
         frequency = remover.Frequency(tokens)
         linguistic_ = remover.linguistic_features(tokens)
-        segmented_ = remover.segmented_text(text)
-        
+        segmented_ = tokens
+
         print(f"Tokens before: {len(tokens)}")
         print(f"Tokens after: {len(filtered)}")
         print(f"frequency   : {frequency}")
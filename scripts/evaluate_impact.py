@@ -1,18 +1,29 @@
 import sys
 import os
 import glob
+import argparse
+from collections import Counter
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import yaml
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
 import numpy as np
 
+from src.stopword_detection.corpus_stats import CorpusStats
+from src.stopword_detection.frequency_analyzer import FrequencyAnalyzer
+from src.stopword_detection.linguistic_rules import LinguisticRules
+
+# Per-document reports and full similarity matrices are only printed for
+# corpora up to this size; larger corpora get summary statistics only
+MAX_REPORT_DOCS = 20
+
+
 class ImpactEvaluator:
-    def __init__(self, config_path= r"config\config.yaml"):
+    def __init__(self, config_path= "config/config.yaml"):
         with open(config_path, "r") as f:
             self.config = yaml.safe_load(f)
+        self.config_path = config_path
         self.segmented_dir = self.config["data_paths"]["segmented_dir"]
         self.stopwords_dir = self.config["data_paths"]["stopwords_dir"]
 
@@ -39,42 +50,104 @@ class ImpactEvaluator:
         stopwords = self.load_stopword_candidates()
         final_path = os.path.join(self.stopwords_dir, "final_stopword_list.txt")
 
-        with open(final_path, "w", encoding="utf-8") as f:
+        # Write beside and rename so a reloading server never reads a
+        # half-written list
+        tmp_path = final_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             for word in sorted(stopwords):
                 f.write(f"{word}\n")
+        os.replace(tmp_path, final_path)
 
         print(f"Final stopword list created with {len(stopwords)} words")
         return stopwords
 
-    def load_documents(self):
-        documents = {}
+    def document_paths(self):
+        return sorted(glob.glob(os.path.join(self.segmented_dir, "*_segmented.txt")))
 
-        for filepath in glob.glob(os.path.join(self.segmented_dir, "*_segmented.txt")):
-            filename = os.path.basename(filepath)
+    def iter_documents(self, paths=None):
+        for filepath in paths or self.document_paths():
             with open(filepath, "r", encoding="utf-8") as f:
-                documents[filename] = f.read()
+                yield f.read()
+
+    def load_documents(self):
+        paths = self.document_paths()
+        return {
+            os.path.basename(path): text
+            for path, text in zip(paths, self.iter_documents(paths))
+        }
+
+    def count_matrix(self, paths):
+        """Term counts of the pre-segmented documents, tokenized once.
 
-        return documents
+        Tokens are split on whitespace only, exactly as segmentation wrote
+        them; the default regex tokenizer would cut Khmer words apart.
+        """
+        vectorizer = CountVectorizer(analyzer=str.split)
+        counts = vectorizer.fit_transform(self.iter_documents(paths))
+        return counts, vectorizer.get_feature_names_out()
+
+    def drop_terms(self, counts, vocab, stopwords):
+        """Remove stopword columns from a count matrix"""
+        stopwords = set(stopwords)
+        keep = np.flatnonzero([term not in stopwords for term in vocab])
+        return counts[:, keep], vocab[keep]
+
+    def top_terms(self, row, vocab, n=5):
+        """Highest-scoring terms of one sparse TF-IDF row, without densifying.
+
+        Same order as argsort(dense_row)[-n:][::-1] with a stable sort:
+        ties go to the later column, and rows with fewer than n nonzero
+        scores are padded with zero-score terms from the end of vocab.
+        """
+        order = np.lexsort((-row.indices, -row.data))[:n]
+        columns = [row.indices[idx] for idx in order]
+        nonzero = set(row.indices)
+        column = len(vocab) - 1
+        while len(columns) < n and column >= 0:
+            if column not in nonzero:
+                columns.append(column)
+            column -= 1
+        return [vocab[column] for column in columns]
+
+    def similarity_blocks(self, tfidf, block_size=1000):
+        """Yield (start_row, dense similarity block) for block_size rows at a time.
+
+        TfidfTransformer rows are L2-normalized, so cosine similarity is the
+        plain dot product and each block only needs block_size x n memory.
+        """
+        for start in range(0, tfidf.shape[0], block_size):
+            block = tfidf[start:start + block_size] @ tfidf.T
+            yield start, block.toarray()
+
+    def mean_similarity(self, tfidf):
+        """Mean of the full cosine similarity matrix in O(nnz).
+
+        sum_ij x_i . x_j equals |sum_i x_i|^2 for L2-normalized rows.
+        """
+        n_docs = tfidf.shape[0]
+        column_sums = np.asarray(tfidf.sum(axis=0)).ravel()
+        return float(column_sums @ column_sums) / (n_docs * n_docs)
 
     def evaluate_tfidf_impact(self, stopwords):
-        documents = self.load_documents()
+        paths = self.document_paths()
 
-        if len(documents) < 2:
+        if len(paths) < 2:
             print("Need at least 2 documents for evaluation")
             return None
 
-        doc_texts = list(documents.values())
-        doc_names = list(documents.keys())
+        doc_names = [os.path.basename(path) for path in paths]
+
+        # One tokenization pass; the filtered variant drops stopword columns.
+        # IDF only depends on each column's document frequency, so this
+        # matches fitting a second vectorizer with stop_words.
+        counts_without, vocab_without = self.count_matrix(paths)
+        counts_with, vocab_with = self.drop_terms(counts_without, vocab_without, stopwords)
 
         # Without stopwords
-        vectorizer_without = TfidfVectorizer()
-        tfidf_without = vectorizer_without.fit_transform(doc_texts)
-        vocab_without = vectorizer_without.get_feature_names_out()
+        tfidf_without = TfidfTransformer().fit_transform(counts_without)
 
         # With stopwords
-        vectorizer_with = TfidfVectorizer(stop_words=stopwords)
-        tfidf_with = vectorizer_with.fit_transform(doc_texts)
-        vocab_with = vectorizer_with.get_feature_names_out()
+        tfidf_with = TfidfTransformer().fit_transform(counts_with)
 
         print("\n=== TF-IDF IMPACT ANALYSIS ===")
         print(f"Without stopwords: {len(vocab_without)} terms")
@@ -83,42 +156,142 @@ class ImpactEvaluator:
             f"Vocabulary reduction: {len(vocab_without) - len(vocab_with)} terms ({100*(1-len(vocab_with)/len(vocab_without)):.1f}%)"
         )
 
-        # Show top terms per document
-        for i, doc_name in enumerate(doc_names):
+        # Show top terms per document (small corpora only)
+        report_docs = doc_names if len(doc_names) <= MAX_REPORT_DOCS else []
+        for i, doc_name in enumerate(report_docs):
             print(f"\n--- {doc_name} ---")
 
             # Without stopwords
-            scores_without = tfidf_without[i].toarray()[0]
-            top_idx_without = np.argsort(scores_without)[-5:][::-1]
-            top_terms_without = [vocab_without[idx] for idx in top_idx_without]
+            top_terms_without = self.top_terms(tfidf_without[i], vocab_without)
             print(f"Top terms (without): {', '.join(top_terms_without)}")
 
             # With stopwords
-            scores_with = tfidf_with[i].toarray()[0]
-            top_idx_with = np.argsort(scores_with)[-5:][::-1]
-            top_terms_with = [vocab_with[idx] for idx in top_idx_with]
+            top_terms_with = self.top_terms(tfidf_with[i], vocab_with)
             print(f"Top terms (with): {', '.join(top_terms_with)}")
 
-        # Calculate similarity matrix
-        sim_without = cosine_similarity(tfidf_without)
-        sim_with = cosine_similarity(tfidf_with)
+        avg_without = self.mean_similarity(tfidf_without)
+        avg_with = self.mean_similarity(tfidf_with)
 
-        print("\n=== DOCUMENT SIMILARITY ===")
-        print("Similarity without stopwords:")
-        print(np.round(sim_without, 3))
-        print("\nSimilarity with stopwords:")
-        print(np.round(sim_with, 3))
+        if report_docs:
+            print("\n=== DOCUMENT SIMILARITY ===")
+            print("Similarity without stopwords:")
+            print(np.round(next(self.similarity_blocks(tfidf_without))[1], 3))
+            print("\nSimilarity with stopwords:")
+            print(np.round(next(self.similarity_blocks(tfidf_with))[1], 3))
 
         return {
             "vocab_reduction": len(vocab_without) - len(vocab_with),
             "vocab_reduction_percent": 100 * (1 - len(vocab_with) / len(vocab_without)),
-            "avg_similarity_without": np.mean(sim_without),
-            "avg_similarity_with": np.mean(sim_with),
+            "avg_similarity_without": avg_without,
+            "avg_similarity_with": avg_with,
         }
 
+    def corpus_stats_from_counts(self, counts, vocab):
+        """CorpusStats read off a count matrix (same tokenization, no re-scan)"""
+        stats = CorpusStats()
+        stats.doc_count = counts.shape[0]
+        doc_freq = np.asarray((counts > 0).sum(axis=0)).ravel()
+        totals = np.asarray(counts.sum(axis=0)).ravel()
+        stats.word_doc_freq = Counter(dict(zip(vocab, doc_freq.tolist())))
+        stats.total_word_counts = Counter(dict(zip(vocab, totals.tolist())))
+        return stats
+
+    def sweep(self, thresholds, min_doc_frequencies):
+        """Evaluate the stopword list produced by every threshold combination.
+
+        The corpus is tokenized once; candidate lists come from the shared
+        statistics and each list is evaluated by dropping columns from the
+        shared count matrix.
+        """
+        paths = self.document_paths()
+        if len(paths) < 2:
+            print("Need at least 2 documents for evaluation")
+            return None
+
+        counts, vocab = self.count_matrix(paths)
+        stats = self.corpus_stats_from_counts(counts, vocab)
+        freq_analyzer = FrequencyAnalyzer(self.config_path)
+        linguistic = set(LinguisticRules().identify_linguistic_stopwords(stats.vocabulary))
+        baseline = self.mean_similarity(TfidfTransformer().fit_transform(counts))
+
+        rows = []
+        for threshold in thresholds:
+            for min_docs in min_doc_frequencies:
+                candidates = freq_analyzer.find_candidates(stats, threshold, min_docs)
+                stopwords = linguistic | {item["word"] for item in candidates}
+                filtered, filtered_vocab = self.drop_terms(counts, vocab, stopwords)
+                # A list that removes every term leaves nothing to compare
+                avg_with = (
+                    self.mean_similarity(TfidfTransformer().fit_transform(filtered))
+                    if len(filtered_vocab)
+                    else 0.0
+                )
+                rows.append(
+                    {
+                        "threshold": threshold,
+                        "min_doc_frequency": min_docs,
+                        "frequency_candidates": len(candidates),
+                        "stopwords": len(stopwords),
+                        "vocab_size": len(filtered_vocab),
+                        "vocab_reduction_percent": 100 * (1 - len(filtered_vocab) / len(vocab)),
+                        "avg_similarity_without": baseline,
+                        "avg_similarity_with": avg_with,
+                    }
+                )
+        return rows
+
+    def print_sweep(self, rows):
+        print("\n=== STOPWORD THRESHOLD SWEEP ===")
+        print(
+            f"{'threshold':>9} {'min_docs':>8} {'freq':>6} {'list':>6} "
+            f"{'vocab':>7} {'reduct%':>8} {'sim_without':>11} {'sim_with':>9}"
+        )
+        for row in rows:
+            print(
+                f"{row['threshold']:>9.2f} {row['min_doc_frequency']:>8d} "
+                f"{row['frequency_candidates']:>6d} {row['stopwords']:>6d} "
+                f"{row['vocab_size']:>7d} {row['vocab_reduction_percent']:>8.1f} "
+                f"{row['avg_similarity_without']:>11.3f} {row['avg_similarity_with']:>9.3f}"
+            )
+
+
+def parse_list(value, cast):
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate stopword removal impact")
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="compare stopword lists over a grid of thresholds instead of "
+        "writing and evaluating the final list",
+    )
+    parser.add_argument(
+        "--thresholds",
+        default="0.1,0.2,0.3,0.5,0.7",
+        help="comma-separated frequency_threshold values for --sweep",
+    )
+    parser.add_argument(
+        "--min-docs",
+        default="1,2,3",
+        help="comma-separated min_doc_frequency values for --sweep",
+    )
+    return parser.parse_args()
+
 
 def main():
+    args = parse_args()
     evaluator = ImpactEvaluator()
+
+    if args.sweep:
+        rows = evaluator.sweep(
+            parse_list(args.thresholds, float), parse_list(args.min_docs, int)
+        )
+        if rows:
+            evaluator.print_sweep(rows)
+        return
+
     stopwords = evaluator.create_final_stopword_list()
     metrics = evaluator.evaluate_tfidf_impact(stopwords)
 
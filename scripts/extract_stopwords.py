@@ -1,31 +1,89 @@
 import sys
 import os
+import argparse
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.stopword_detection.frequency_analyzer import FrequencyAnalyzer
 from src.stopword_detection.linguistic_rules import LinguisticRules
+from src.stopword_detection.corpus_stats import (
+    build_approximate_stats,
+    build_corpus_stats,
+    load_corpus_stats,
+    update_corpus_stats,
+)
 import yaml
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract Khmer stopword candidates")
+    parser.add_argument(
+        "--rebuild-stats",
+        action="store_true",
+        help="recount the whole corpus instead of updating the saved statistics",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of counting processes (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--approximate",
+        action="store_true",
+        help="bounded-memory sketch statistics (not saved, no incremental "
+        "update, single process)",
+    )
+    args = parser.parse_args()
+    if args.approximate and args.workers > 1:
+        parser.error("--approximate counts in a single process; drop --workers")
+    return args
+
+
 def main():
-    with open("D:/1_ITC/ITC-5th-YEAR/IWR/TP/Final_Project/khmer-stopword-removal/config/config.yaml", "r") as f:
+    args = parse_args()
+
+    with open("config/config.yaml", "r") as f:
         config = yaml.safe_load(f)
 
     segmented_dir = config["data_paths"]["segmented_dir"]
     stopwords_dir = config["data_paths"]["stopwords_dir"]
+    stats_path = os.path.join(config["data_paths"]["processed_dir"], "corpus_stats.json")
+
+    if args.approximate:
+        print("Collecting approximate corpus statistics...")
+        stats = build_approximate_stats(
+            segmented_dir, **config["stopword_detection"]["approximate"]
+        )
+        print(f"Doc-frequency error bound: {stats.doc_freq_error_bound():.2f} documents")
+    elif not args.rebuild_stats and os.path.exists(stats_path):
+        print(f"Updating corpus statistics from {stats_path}...")
+        stats, counted = update_corpus_stats(
+            load_corpus_stats(stats_path), segmented_dir, workers=args.workers
+        )
+        print(f"Counted {len(counted)} new or changed files")
+    else:
+        print("Collecting corpus statistics...")
+        stats = build_corpus_stats(segmented_dir, workers=args.workers, manifest=True)
+
+    if not args.approximate:
+        stats.save(stats_path)
+    print(f"Documents: {stats.doc_count}")
 
     print("Running frequency analysis...")
     freq_analyzer = FrequencyAnalyzer()
-    freq_candidates = freq_analyzer.analyze_corpus(segmented_dir)
+    freq_candidates = freq_analyzer.find_candidates(stats)
 
     freq_output = os.path.join(stopwords_dir, "frequency_candidates.txt")
     freq_analyzer.save_candidates(freq_candidates, freq_output)
     print(f"Found {len(freq_candidates)} frequency-based candidates")
 
-    print("Building vocabulary for linguistic analysis...")
     ling_rules = LinguisticRules()
-    vocabulary = ling_rules.build_vocabulary(segmented_dir)
-    print(f"Total vocabulary size: {len(vocabulary)}")
+    vocabulary = stats.vocabulary
+    if args.approximate:
+        print(f"Top-k vocabulary size (approximate, capped at capacity): {len(vocabulary)}")
+    else:
+        print(f"Total vocabulary size: {len(vocabulary)}")
 
     print("Applying linguistic rules...")
     ling_candidates = ling_rules.identify_linguistic_stopwords(vocabulary)
@@ -1,33 +1,110 @@
 import sys
 import os
+import argparse
+from itertools import islice
+from multiprocessing import Pool
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.preprocessing.text_loader import load_corpus, save_segmented
+from src.preprocessing.text_loader import (
+    iter_corpus,
+    iter_article_stores,
+    save_segmented,
+)
 from src.segmentation.segmenter_interface import KhmerSegmenter
 from src.preprocessing.unicode_normalizer import normalize_text
 import yaml
 
 
+# Documents handed to the pool at a time, per worker; imap_unordered would
+# otherwise drain the whole corpus generator into its task queue
+BATCH_PER_WORKER = 16
+
+# One segmenter per worker process, created by init_worker
+worker_segmenter = None
+
+
+def init_worker(max_length):
+    global worker_segmenter
+    worker_segmenter = KhmerSegmenter(max_length=max_length)
+
+
+def segment_document(item):
+    doc_id, text = item
+    return doc_id, worker_segmenter.segment(normalize_text(text))
+
+
+def iter_batches(documents, size):
+    """Lists of up to size documents, read from the iterator lazily"""
+    documents = iter(documents)
+    while True:
+        batch = list(islice(documents, size))
+        if not batch:
+            return
+        yield batch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Segment the raw Khmer corpus")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of segmentation processes (default: 1, serial)",
+    )
+    parser.add_argument(
+        "--split-articles",
+        action="store_true",
+        help="treat every article between separator lines as its own document",
+    )
+    parser.add_argument(
+        "--store",
+        action="append",
+        default=[],
+        help="segment the articles of this JSONL article store (.jsonl, "
+        ".jsonl.gz, .jsonl.zst) instead of raw_dir; may be repeated",
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+
     with open("config/config.yaml", "r") as f:
         config = yaml.safe_load(f)
 
     raw_dir = config["data_paths"]["raw_dir"]
     segmented_dir = config["data_paths"]["segmented_dir"]
+    max_length = config["segmentation"]["max_length"]
 
-    print("Loading raw corpus...")
-    corpus = load_corpus(raw_dir)
+    if args.store:
+        print(f"Streaming {len(args.store)} article store(s)...")
+        corpus = iter_article_stores(args.store)
+    else:
+        print("Streaming raw corpus...")
+        corpus = iter_corpus(raw_dir, split_articles=args.split_articles)
 
-    print("Initializing segmenter...")
-    segmenter = KhmerSegmenter()
+    if args.workers > 1:
+        print(f"Processing documents with {args.workers} workers...")
+        with Pool(
+            args.workers, initializer=init_worker, initargs=(max_length,)
+        ) as pool:
+            for batch in iter_batches(corpus, args.workers * BATCH_PER_WORKER):
+                for doc_id, segmented in pool.imap_unordered(
+                    segment_document, batch
+                ):
+                    save_segmented(doc_id, segmented, segmented_dir)
+                    print(f"Processed: {doc_id} ({len(segmented)} tokens)")
+    else:
+        print("Initializing segmenter...")
+        segmenter = KhmerSegmenter(max_length=max_length)
 
-    print("Processing documents...")
-    for doc_id, text in corpus.items():
-        normalized = normalize_text(text)
-        segmented = segmenter.segment(normalized)
-        save_segmented(doc_id, segmented, segmented_dir)
-        print(f"Processed: {doc_id} ({len(segmented)} tokens)")
+        print("Processing documents...")
+        for doc_id, text in corpus:
+            normalized = normalize_text(text)
+            segmented = segmenter.segment(normalized)
+            save_segmented(doc_id, segmented, segmented_dir)
+            print(f"Processed: {doc_id} ({len(segmented)} tokens)")
 
     print(f"Segmentation complete. Files saved to {segmented_dir}")
 
@@ -0,0 +1,140 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB-API connections.
+
+    connect is a zero-argument callable returning a new connection
+    (e.g. ``lambda: psycopg2.connect(**DB_CONFIG)``), which keeps the pool
+    usable with any stand-in connection in tests.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=5.0,
+                 health_check=True):
+        if min_size > max_size:
+            raise ValueError("min_size must not exceed max_size")
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check = health_check
+        self.idle = deque()
+        self.size = 0
+        self.condition = threading.Condition()
+
+    def prefill(self):
+        """Open connections until min_size are available"""
+        while True:
+            with self.condition:
+                if self.size >= self.min_size:
+                    return
+                self.size += 1
+            conn = self.open_connection()
+            with self.condition:
+                self.idle.append(conn)
+                self.condition.notify()
+
+    def open_connection(self):
+        try:
+            return self.connect()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+    def is_healthy(self, conn):
+        if getattr(conn, 'closed', False):
+            return False
+        try:
+            cur = conn.cursor()
+            cur.execute('SELECT 1')
+            cur.fetchone()
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def getconn(self, timeout=None):
+        """Check out a connection, waiting up to timeout seconds for one"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            with self.condition:
+                while not self.idle and self.size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"No connection available within {timeout}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    self.condition.wait(remaining)
+
+                if self.idle:
+                    conn = self.idle.pop()
+                else:
+                    conn = None
+                    self.size += 1
+
+            if conn is None:
+                return self.open_connection()
+            if not self.health_check or self.is_healthy(conn):
+                return conn
+            # Stale connection (server restart, idle timeout): replace it
+            self.discard(conn)
+
+    def putconn(self, conn, close=False):
+        """Return a connection; closed or broken ones leave the pool"""
+        if close or getattr(conn, 'closed', False):
+            self.discard(conn)
+            return
+        try:
+            conn.rollback()
+        except Exception:
+            self.discard(conn)
+            return
+        with self.condition:
+            self.idle.append(conn)
+            self.condition.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        with self.condition:
+            idle = list(self.idle)
+            self.idle.clear()
+        for conn in idle:
+            self.discard(conn)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'size': self.size,
+                'idle': len(self.idle),
+                'in_use': self.size - len(self.idle),
+                'max_size': self.max_size,
+            }
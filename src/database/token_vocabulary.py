@@ -0,0 +1,77 @@
+import threading
+
+from psycopg2.extras import execute_values
+
+
+class TokenVocabulary:
+    """Interns tokens into the token_vocabulary table.
+
+    Analyses can then be stored as INTEGER[] of token IDs instead of JSONB
+    string arrays. Known IDs are cached in memory in both directions.
+    """
+
+    def __init__(self, table="token_vocabulary"):
+        self.table = table
+        self.ids = {}
+        self.tokens = {}
+        self.lock = threading.Lock()
+
+    def create_table(self, cur):
+        cur.execute(f'''
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                id SERIAL PRIMARY KEY,
+                token TEXT NOT NULL UNIQUE
+            )
+        ''')
+
+    def remember(self, rows):
+        with self.lock:
+            for token_id, token in rows:
+                self.ids[token] = token_id
+                self.tokens[token_id] = token
+
+    def intern(self, conn, tokens):
+        """Return (token -> id mapping covering every token given, new rows).
+
+        IDs inserted here only exist once conn's transaction commits, so
+        they are not cached yet: pass the returned rows to remember() after
+        the commit succeeds.
+        """
+        wanted = set(tokens)
+        with self.lock:
+            ids = {t: self.ids[t] for t in wanted if t in self.ids}
+        missing = sorted(wanted - ids.keys())
+        rows = []
+        if missing:
+            cur = conn.cursor()
+            # Sorted inserts keep concurrent writers from deadlocking
+            execute_values(
+                cur,
+                f"INSERT INTO {self.table} (token) VALUES %s "
+                "ON CONFLICT (token) DO NOTHING",
+                [(token,) for token in missing],
+            )
+            cur.execute(
+                f"SELECT id, token FROM {self.table} WHERE token = ANY(%s)",
+                (missing,),
+            )
+            rows = cur.fetchall()
+            cur.close()
+            ids.update((token, token_id) for token_id, token in rows)
+        return ids, rows
+
+    def decode(self, conn, token_ids):
+        """Return (tokens for token_ids, unknown IDs). IDs missing from the
+        table are left out of the tokens and reported in the second list."""
+        missing = sorted({i for i in token_ids if i not in self.tokens})
+        if missing:
+            cur = conn.cursor()
+            cur.execute(
+                f"SELECT id, token FROM {self.table} WHERE id = ANY(%s)",
+                (missing,),
+            )
+            self.remember(cur.fetchall())
+            cur.close()
+        tokens = [self.tokens[i] for i in token_ids if i in self.tokens]
+        unknown = sorted({i for i in token_ids if i not in self.tokens})
+        return tokens, unknown
@@ -0,0 +1,156 @@
+import queue
+import threading
+import time
+
+STOP = object()
+
+
+class QueueClosed(Exception):
+    """Raised by submit() once close() has been called"""
+
+
+class WriteBehindQueue:
+    """Buffer rows in memory and write them in batches from a background thread.
+
+    write_batch(conn, rows) performs the actual insert for a list of rows;
+    connections come from a ConnectionPool. If on_commit is given, it is
+    called with write_batch's return value once the batch has committed.
+    When the queue is full, on_full='block' waits up to put_timeout
+    seconds for space and on_full='drop' rejects the row at once; submit()
+    returns False for rejected rows so the caller can report them, and
+    raises QueueClosed after close().
+    """
+
+    def __init__(self, pool, write_batch, batch_size=100, flush_interval=1.0,
+                 max_queue=10000, on_full='block', put_timeout=0.5,
+                 on_commit=None):
+        if on_full not in ('block', 'drop'):
+            raise ValueError("on_full must be 'block' or 'drop'")
+        self.pool = pool
+        self.write_batch = write_batch
+        self.on_commit = on_commit
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_full = on_full
+        self.put_timeout = put_timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = None
+        self.closed = False
+        self.lock = threading.Lock()
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    def start(self):
+        with self.lock:
+            if self.thread is None and not self.closed:
+                self.thread = threading.Thread(
+                    target=self.run, name='write-behind', daemon=True
+                )
+                self.thread.start()
+
+    def submit(self, row):
+        """Enqueue a row; returns False if the queue is full"""
+        if self.closed:
+            raise QueueClosed('Write-behind queue is closed')
+        self.start()
+        try:
+            if self.on_full == 'block':
+                self.queue.put(row, timeout=self.put_timeout)
+            else:
+                self.queue.put_nowait(row)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+        with self.lock:
+            self.submitted += 1
+        return True
+
+    def collect_batch(self):
+        """Wait for a first row, then gather more until the batch is full
+        or flush_interval has passed. Returns (rows, stop_requested)."""
+        first = self.queue.get()
+        if first is STOP:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def run(self):
+        while True:
+            batch, stop = self.collect_batch()
+            if batch:
+                self.flush(batch)
+            if stop:
+                return
+
+    def flush(self, batch):
+        started = time.monotonic()
+        try:
+            with self.pool.connection() as conn:
+                result = self.write_batch(conn, batch)
+                conn.commit()
+            written, failed = len(batch), 0
+        except Exception as e:
+            print(f"Write-behind flush failed ({len(batch)} rows): {e}")
+            result, written, failed = None, 0, len(batch)
+        elapsed = time.monotonic() - started
+
+        with self.lock:
+            self.written += written
+            self.failed += failed
+            self.batches += 1
+            self.last_flush_seconds = elapsed
+            self.total_flush_seconds += elapsed
+
+        # The rows are committed whatever the hook does
+        if written and self.on_commit is not None:
+            try:
+                self.on_commit(result)
+            except Exception as e:
+                print(f"Write-behind on_commit hook failed: {e}")
+
+    def close(self, timeout=None):
+        """Stop accepting rows and flush everything already queued"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            thread = self.thread
+        if thread is not None:
+            self.queue.put(STOP)
+            thread.join(timeout)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'queue_depth': self.queue.qsize(),
+                'max_queue': self.queue.maxsize,
+                'submitted': self.submitted,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'batches': self.batches,
+                'last_flush_seconds': self.last_flush_seconds,
+                'avg_flush_seconds': (
+                    self.total_flush_seconds / self.batches if self.batches else 0.0
+                ),
+            }
@@ -0,0 +1,235 @@
+import io
+import os
+import json
+import gzip
+import zlib
+
+# Bytes read at a time while looking for a torn gzip member / zstd frame
+SCAN_BYTES = 1024 * 1024
+
+
+def open_text(path, mode):
+    """Open a .jsonl, .jsonl.gz or .jsonl.zst file as UTF-8 text.
+
+    mode is "r" or "a". Appending to a compressed file adds a new gzip
+    member / zstd frame, and readers continue across them. Bytes that are
+    not valid UTF-8 (a record torn mid-character) are replaced on read, so
+    only that record fails to parse.
+    """
+    errors = "replace" if mode == "r" else "strict"
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8", errors=errors)
+    if path.endswith(".zst"):
+        import zstandard  # only needed for .zst stores
+
+        raw = open(path, mode + "b")
+        if mode == "r":
+            stream = zstandard.ZstdDecompressor().stream_reader(
+                raw, read_across_frames=True, closefd=True
+            )
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8", errors=errors)
+    return open(path, mode, encoding="utf-8", errors=errors)
+
+
+def is_compressed(path):
+    return path.endswith((".gz", ".zst"))
+
+
+def record_compressor(path):
+    """Function turning one encoded record into a complete gzip member or
+    zstd frame, or None for plain files"""
+    if path.endswith(".gz"):
+        return gzip.compress
+    if path.endswith(".zst"):
+        import zstandard
+
+        return zstandard.ZstdCompressor().compress
+    return None
+
+
+def new_decompressor(path):
+    """Decompressor that stops at the end of one gzip member / zstd frame"""
+    if path.endswith(".gz"):
+        return zlib.decompressobj(wbits=31)
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+def stream_errors(path):
+    """Exceptions reading a truncated or corrupt store can raise"""
+    errors = (EOFError, zlib.error, gzip.BadGzipFile)
+    if path.endswith(".zst"):
+        import zstandard
+
+        errors += (zstandard.ZstdError,)
+    return errors
+
+
+def complete_length(path):
+    """Bytes of a compressed store up to the end of its last complete gzip
+    member / zstd frame"""
+    errors = stream_errors(path)
+    complete = offset = 0
+    decompressor = None
+    pending = b""
+    with open(path, "rb") as f:
+        while True:
+            if not pending:
+                pending = f.read(SCAN_BYTES)
+                if not pending:
+                    break
+            if decompressor is None:
+                decompressor = new_decompressor(path)
+            try:
+                decompressor.decompress(pending)
+            except errors:
+                break
+            if decompressor.eof:
+                unused = decompressor.unused_data
+                offset += len(pending) - len(unused)
+                complete = offset
+                pending = unused
+                decompressor = None
+            else:
+                offset += len(pending)
+                pending = b""
+    return complete
+
+
+def salvage_records(path, start):
+    """Complete JSONL lines that can still be decoded from the torn member
+    or frame beginning at start"""
+    decompressor = new_decompressor(path)
+    decoded = []
+    with open(path, "rb") as f:
+        f.seek(start)
+        for block in iter(lambda: f.read(SCAN_BYTES), b""):
+            try:
+                decoded.append(decompressor.decompress(block))
+            except stream_errors(path):
+                break
+    records = []
+    # The piece after the last newline is the record the crash cut short
+    for line in b"".join(decoded).split(b"\n")[:-1]:
+        try:
+            json.loads(line)
+        except ValueError:
+            continue
+        records.append(line + b"\n")
+    return records
+
+
+def repair_compressed_tail(path):
+    """Cut an unfinished gzip member / zstd frame left by a crash off the
+    end of path, re-appending the complete records it held; appending
+    after it would make everything from there on unreadable. Returns the
+    number of records recovered, or None if the file was intact."""
+    complete = complete_length(path)
+    if complete == os.path.getsize(path):
+        return None
+    records = salvage_records(path, complete)
+    compress = record_compressor(path)
+    with open(path, "r+b") as f:
+        f.truncate(complete)
+        f.seek(complete)
+        for record in records:
+            f.write(compress(record))
+    return len(records)
+
+
+def ends_mid_line(path):
+    """Whether a plain JSONL file is non-empty and lacks a final newline"""
+    if is_compressed(path) or not os.path.exists(path):
+        return False
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+class ArticleStore:
+    """Append-only JSONL file of scraped articles, one record per line.
+
+    Every append is flushed immediately, so an interrupted scrape keeps all
+    finished articles. In .gz / .zst stores each record is its own gzip
+    member / zstd frame (at some cost in compression ratio), so a crash
+    can only leave the last one unfinished; reopening the store repairs
+    that, and iter_articles skips a plain record torn by the crash.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.compress = record_compressor(path)
+        torn = ends_mid_line(path)
+        if self.compress is not None and os.path.exists(path):
+            recovered = repair_compressed_tail(path)
+            if recovered is not None:
+                print(f"Repaired torn end of {path} ({recovered} records recovered)")
+        self.file = open(path, "ab")
+        if torn:
+            # Terminate the record a crash cut short so it is skipped on
+            # read instead of swallowing the next one
+            self.file.write(b"\n")
+        self.count = 0
+
+    def append(self, article):
+        data = (json.dumps(article, ensure_ascii=False) + "\n").encode("utf-8")
+        if self.compress is not None:
+            data = self.compress(data)
+        self.file.write(data)
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path):
+    with open_text(path, "r") as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # A record cut short by an interrupted write
+                    continue
+        except stream_errors(path):
+            # Compressed stream truncated mid-member, e.g. by a crash that
+            # no later ArticleStore has repaired yet
+            return
+
+
+def iter_articles(path, latest_only=False):
+    """Yield article records one at a time.
+
+    Recrawled articles are appended again when they change; with
+    latest_only=True only the last record per URL is yielded, at the cost
+    of one extra pass and a set of line numbers.
+    """
+    if not latest_only:
+        yield from iter_records(path)
+        return
+
+    last_index = {}
+    for index, record in enumerate(iter_records(path)):
+        last_index[record.get("url")] = index
+    keep = set(last_index.values())
+    for index, record in enumerate(iter_records(path)):
+        if index in keep:
+            yield record
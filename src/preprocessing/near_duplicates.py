@@ -0,0 +1,156 @@
+import re
+import sqlite3
+import hashlib
+
+import numpy as np
+
+from src.preprocessing.unicode_normalizer import normalize_text
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; with a, b
+# below 2**32 the products stay inside uint64
+PRIME = 4294967311
+# Shingles hashed per step, bounding the num_perm x chunk matrix in memory
+SHINGLE_CHUNK = 4096
+WHITESPACE = re.compile(r"\s+")
+
+
+class MinHasher:
+    """MinHash signatures over character shingles.
+
+    Khmer is written without spaces between words, so shingles are runs of
+    `shingle_size` characters of the normalized text rather than word
+    n-grams.
+    """
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 2**32, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 2**32, size=num_perm, dtype=np.uint64)
+
+    def shingle_hashes(self, text):
+        """Distinct 32-bit hashes of the text's character shingles"""
+        text = WHITESPACE.sub(" ", normalize_text(text)).strip()
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        if len(codes) == 0:
+            return codes
+        k = min(self.shingle_size, len(codes))
+        # Polynomial rolling hash of every k-character window, modulo 2**64
+        hashes = np.zeros(len(codes) - k + 1, dtype=np.uint64)
+        for i in range(k):
+            hashes = hashes * np.uint64(1000003) + codes[i:len(codes) - k + 1 + i]
+        return np.unique(hashes >> np.uint64(32))
+
+    def signature(self, text):
+        """num_perm minimum hash values, or None for empty text"""
+        x = self.shingle_hashes(text)
+        if len(x) == 0:
+            return None
+        minimum = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(x), SHINGLE_CHUNK):
+            chunk = x[None, start:start + SHINGLE_CHUNK]
+            permuted = (self.a[:, None] * chunk + self.b[:, None]) % np.uint64(PRIME)
+            np.minimum(minimum, permuted.min(axis=1), out=minimum)
+        return minimum
+
+
+def estimated_jaccard(sig1, sig2):
+    return float(np.mean(sig1 == sig2))
+
+
+class NearDuplicateIndex:
+    """Streaming near-duplicate detection with MinHash LSH.
+
+    Documents are added one at a time. Each is compared against the
+    representatives (first-seen documents) that share an LSH band with it,
+    and counts as a duplicate of the most similar one whose estimated
+    Jaccard similarity reaches `threshold`. Only representatives are
+    indexed. The index lives in SQLite, on disk when `path` is given, so
+    memory stays bounded for corpora of millions of articles.
+    """
+
+    def __init__(
+        self,
+        num_perm=128,
+        bands=16,
+        shingle_size=5,
+        threshold=0.8,
+        path=":memory:",
+        seed=1,
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER,
+                key INTEGER,
+                doc INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_bands ON bands (band, key);
+            """
+        )
+        self.pending_writes = 0
+
+    def band_keys(self, signature):
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8).digest()
+            yield band, int.from_bytes(digest, "little", signed=True)
+
+    def add(self, name, text):
+        """Index a document; returns (representative name, similarity) if it
+        is a near duplicate, else None"""
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+        keys = list(self.band_keys(signature))
+
+        candidates = set()
+        for band, key in keys:
+            rows = self.conn.execute(
+                "SELECT doc FROM bands WHERE band = ? AND key = ?", (band, key)
+            ).fetchall()
+            candidates.update(doc for doc, in rows)
+
+        best = None
+        for doc in candidates:
+            rep_name, blob = self.conn.execute(
+                "SELECT name, signature FROM docs WHERE id = ?", (doc,)
+            ).fetchone()
+            similarity = estimated_jaccard(
+                signature, np.frombuffer(blob, dtype=np.uint64)
+            )
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (rep_name, similarity)
+        if best is not None:
+            return best
+
+        cursor = self.conn.execute(
+            "INSERT INTO docs (name, signature) VALUES (?, ?)",
+            (name, signature.tobytes()),
+        )
+        self.conn.executemany(
+            "INSERT INTO bands (band, key, doc) VALUES (?, ?, ?)",
+            [(band, key, cursor.lastrowid) for band, key in keys],
+        )
+        self.pending_writes += 1
+        if self.pending_writes >= 1000:
+            self.conn.commit()
+            self.pending_writes = 0
+        return None
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
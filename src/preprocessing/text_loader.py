@@ -1,13 +1,61 @@
 import os
 import glob
 
-def load_corpus(raw_dir):
-    corpus = {}
-    for filepath in glob.glob(os.path.join(raw_dir, "*.txt")):
+from src.preprocessing.article_store import iter_articles
+
+# json_to_txt.py and scraping.py separate articles with a line of "=" * 80
+SEPARATOR_MIN_LENGTH = 10
+
+
+def is_article_separator(line):
+    stripped = line.strip()
+    return len(stripped) >= SEPARATOR_MIN_LENGTH and set(stripped) == {"="}
+
+
+def iter_file_articles(filepath):
+    """Yield the articles of one file, reading it line by line"""
+    buffer = []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            if is_article_separator(line):
+                article = ''.join(buffer)
+                buffer = []
+                if article.strip():
+                    yield article
+            else:
+                buffer.append(line)
+    article = ''.join(buffer)
+    if article.strip():
+        yield article
+
+
+def iter_corpus(raw_dir, split_articles=False):
+    """Yield (doc_id, text) pairs one document at a time.
+
+    With split_articles=True each file is cut on its article separators
+    and every article is yielded as its own document.
+    """
+    for filepath in sorted(glob.glob(os.path.join(raw_dir, "*.txt"))):
         filename = os.path.basename(filepath)
-        with open(filepath, 'r', encoding='utf-8') as f:
-            corpus[filename] = f.read()
-    return corpus
+        if split_articles:
+            for index, article in enumerate(iter_file_articles(filepath)):
+                yield f"{filename}_{index:05d}", article
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                yield filename, f.read()
+
+
+def iter_article_stores(paths):
+    """Yield (doc_id, text) for every article in JSONL article stores,
+    reading one record at a time"""
+    for path in paths:
+        name = os.path.basename(path)
+        for index, article in enumerate(iter_articles(path, latest_only=True)):
+            yield f"{name}_{index:05d}", article["content"]
+
+
+def load_corpus(raw_dir):
+    return dict(iter_corpus(raw_dir))
 
 def save_segmented(doc_id, segmented_text, output_dir):
     os.makedirs(output_dir, exist_ok=True)
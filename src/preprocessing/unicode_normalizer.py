@@ -1,5 +1,19 @@
 import unicodedata
 
+COENG = "្"
+
+
 def normalize_text(text):
     normalized = unicodedata.normalize('NFKC', text)
     return normalized.strip()
+
+
+def is_cluster_boundary(text, index):
+    """True if a Khmer character cluster may start at text[index]
+    (i.e. it is not a vowel sign/diacritic or a subscript consonant)"""
+    if index <= 0 or index >= len(text):
+        return True
+    return not (
+        unicodedata.category(text[index]).startswith('M')
+        or text[index - 1] == COENG
+    )
@@ -0,0 +1,75 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class SegmentCache:
+    """Bounded LRU of segmented sentences, keyed by a hash of the sentence.
+
+    Entries are evicted least-recently-used first once either max_entries
+    or max_bytes (UTF-8 size of the cached tokens) is exceeded.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def make_key(self, sentence):
+        return hashlib.blake2b(sentence.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, sentence):
+        key = self.make_key(sentence)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, sentence, tokens):
+        key = self.make_key(sentence)
+        tokens = tuple(tokens)
+        size = sum(len(token.encode("utf-8")) for token in tokens)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.entries[key] = (tokens, size)
+            self.bytes += size
+
+            while len(self.entries) > self.max_entries or (
+                self.max_bytes is not None and self.bytes > self.max_bytes
+            ):
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
@@ -1,13 +1,83 @@
+import re
+
 from khmernltk import word_tokenize
 
+from src.preprocessing.unicode_normalizer import is_cluster_boundary
+
+# Split after khan, bariyoosan, camnuc pii kuuh and newlines
+SENTENCE_BOUNDARY = re.compile(r"(?<=[។៕៖\n])")
+
 
 class KhmerSegmenter:
-    def __init__(self, model="khmer-nltk"):
+    def __init__(self, model="khmer-nltk", max_length=512, cache=None):
         self.model = model
+        self.max_length = max_length
+        self.cache = cache
+
+    def split_long(self, sentence):
+        """Cut a sentence longer than max_length, preferring spaces and
+        never separating a consonant from its vowel signs or subscripts"""
+        while len(sentence) > self.max_length:
+            cut = sentence.rfind(" ", 0, self.max_length) + 1
+            if cut == 0:
+                cut = self.max_length
+                while cut > 1 and not is_cluster_boundary(sentence, cut):
+                    cut -= 1
+            yield sentence[:cut]
+            sentence = sentence[cut:]
+        if sentence:
+            yield sentence
+
+    def split_sentences(self, text):
+        """Split text into sentences of at most max_length characters"""
+        if not self.max_length:
+            return [text]
+
+        sentences = []
+        for sentence in SENTENCE_BOUNDARY.split(text):
+            sentences.extend(self.split_long(sentence))
+        return sentences
+
+    def split_chunks(self, text):
+        """Pack sentences into chunks of at most max_length characters"""
+        if not self.max_length:
+            return [text]
+
+        chunks = []
+        current = ""
+        for piece in self.split_sentences(text):
+            if current and len(current) + len(piece) > self.max_length:
+                chunks.append(current)
+                current = ""
+            current += piece
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def tokenize(self, chunk):
+        if self.cache is None:
+            return word_tokenize(chunk)
+
+        tokens = self.cache.get(chunk)
+        if tokens is None:
+            tokens = word_tokenize(chunk)
+            self.cache.put(chunk, tokens)
+        return tokens
 
     def segment(self, text):
         try:
-            tokens = word_tokenize(text)
+            # With a cache, look up sentence by sentence so that documents
+            # sharing sentences reuse each other's segmentation
+            if self.cache is None:
+                chunks = self.split_chunks(text)
+            else:
+                chunks = self.split_sentences(text)
+
+            tokens = []
+            for chunk in chunks:
+                chunk = chunk.strip()
+                if chunk:
+                    tokens.extend(self.tokenize(chunk))
             return [token.strip() for token in tokens if token.strip()]
         except Exception as e:
             print(f"Segmentation error: {e}")
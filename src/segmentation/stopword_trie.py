@@ -0,0 +1,90 @@
+import unicodedata
+
+from src.preprocessing.unicode_normalizer import is_cluster_boundary
+
+END = None
+
+
+def is_token_boundary(text, index):
+    """Cluster boundary that also does not cut through a number or a
+    Latin word"""
+    if not is_cluster_boundary(text, index):
+        return False
+    if 0 < index < len(text):
+        before, after = text[index - 1], text[index]
+        if before.isdigit() and after.isdigit():
+            return False
+        if before.isascii() and after.isascii() and before.isalpha() and after.isalpha():
+            return False
+    return True
+
+
+def is_word_char(char):
+    return unicodedata.category(char)[0] in "LMN"
+
+
+def is_word_boundary(text, index):
+    """Text edge, or next to whitespace or punctuation. Khmer writes no
+    spaces between words, so most word boundaries are not visible here."""
+    if index == 0 or index == len(text):
+        return True
+    return not (is_word_char(text[index - 1]) and is_word_char(text[index]))
+
+
+class StopwordTrie:
+    """Character trie over the stopword list for longest-match scanning of
+    unsegmented text. Matches only start and end on Khmer cluster
+    boundaries, so a stopword never splits a consonant from its vowel
+    signs or subscripts, nor cuts through a number or Latin word.
+
+    A cluster boundary is not a word boundary: a stopword that is also
+    the start or end of a content word still matches. With
+    word_boundaries=True only matches with a word boundary on both sides
+    are taken."""
+
+    def __init__(self, words=()):
+        self.root = {}
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if not word:
+            return
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        if END not in node:
+            node[END] = True
+            self.size += 1
+
+    def longest_match(self, text, start, boundary=is_token_boundary):
+        """End index of the longest stopword starting at start, or -1"""
+        node = self.root
+        end = -1
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            if END in node and boundary(text, i + 1):
+                end = i + 1
+        return end
+
+    def scan(self, text, word_boundaries=False):
+        """Split text into (span, is_stopword) pieces, whitespace dropped"""
+        boundary = is_word_boundary if word_boundaries else is_token_boundary
+        spans = []
+        span_start = 0
+        i = 0
+        while i < len(text):
+            end = self.longest_match(text, i, boundary) if boundary(text, i) else -1
+            if end > i:
+                if text[span_start:i].strip():
+                    spans.append((text[span_start:i], False))
+                spans.append((text[i:end], True))
+                i = span_start = end
+            else:
+                i += 1
+        if text[span_start:].strip():
+            spans.append((text[span_start:], False))
+        return spans
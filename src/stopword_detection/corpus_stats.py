@@ -0,0 +1,307 @@
+import os
+import glob
+import json
+import re
+import hashlib
+from collections import Counter
+from multiprocessing import Pool
+
+from src.stopword_detection.sketches import CountMinSketch, SpaceSaving
+
+# Files larger than this are split into byte ranges for parallel counting
+CHUNK_BYTES = 64 * 1024 * 1024
+ASCII_SPACE = re.compile(rb"\s")
+
+
+class CorpusStats:
+    """Document frequencies, token counts and vocabulary of a segmented corpus.
+
+    Built in a single pass over the *_segmented.txt files and shared by
+    FrequencyAnalyzer and LinguisticRules; can be saved to and loaded from
+    JSON so later runs skip the scan. When built with manifest=True,
+    manifest maps each counted file name to its size, mtime and content
+    digest so update_corpus_stats can count only new files.
+    """
+
+    def __init__(self):
+        self.doc_count = 0
+        self.word_doc_freq = Counter()
+        self.total_word_counts = Counter()
+        self.manifest = {}
+
+    @property
+    def vocabulary(self):
+        return self.word_doc_freq.keys()
+
+    def add_document(self, tokens):
+        self.add_counts(Counter(tokens))
+
+    def add_counts(self, counts):
+        """Add one document given as a Counter of its tokens"""
+        self.doc_count += 1
+        self.word_doc_freq.update(counts.keys())
+        self.total_word_counts.update(counts)
+
+    def merge(self, other):
+        self.doc_count += other.doc_count
+        self.word_doc_freq.update(other.word_doc_freq)
+        self.total_word_counts.update(other.total_word_counts)
+        self.manifest.update(other.manifest)
+
+    def add_file(self, filepath):
+        with open(filepath, "r", encoding="utf-8") as f:
+            self.add_document(f.read().split())
+
+    def save(self, output_path):
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        # Write to a temporary file first so an interrupted run never
+        # leaves a truncated state file behind
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "doc_count": self.doc_count,
+                    "word_doc_freq": self.word_doc_freq,
+                    "total_word_counts": self.total_word_counts,
+                    "manifest": self.manifest,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, output_path)
+
+
+class ApproximateCorpusStats:
+    """Bounded-memory stand-in for CorpusStats.
+
+    Document frequencies are tracked with a Space-Saving heavy-hitters
+    summary and total counts with a Count-Min sketch, so memory stays fixed
+    however much text is streamed through. Only the tracked heavy hitters
+    form word_doc_freq and the vocabulary; each of their document
+    frequencies overestimates the truth by at most doc_freq_error_bound().
+    """
+
+    def __init__(self, capacity=50000, epsilon=0.0001, delta=0.001):
+        self.doc_count = 0
+        self.doc_freq_summary = SpaceSaving(capacity)
+        self.total_word_counts = CountMinSketch(epsilon, delta)
+
+    @property
+    def word_doc_freq(self):
+        return dict(self.doc_freq_summary.items())
+
+    @property
+    def vocabulary(self):
+        return self.doc_freq_summary.counts.keys()
+
+    def doc_freq_error_bound(self):
+        return self.doc_freq_summary.error_bound()
+
+    def add_document(self, tokens):
+        self.add_counts(Counter(tokens))
+
+    def add_counts(self, counts):
+        self.doc_count += 1
+        for token in counts:
+            self.doc_freq_summary.add(token)
+        self.total_word_counts.update(counts)
+
+    def add_file(self, filepath):
+        with open(filepath, "r", encoding="utf-8") as f:
+            self.add_document(f.read().split())
+
+
+def build_approximate_stats(segmented_dir, capacity=50000, epsilon=0.0001, delta=0.001):
+    stats = ApproximateCorpusStats(capacity, epsilon, delta)
+    for filepath in list_segmented_files(segmented_dir):
+        stats.add_file(filepath)
+    return stats
+
+
+def split_ranges(filepath, chunk_bytes):
+    size = os.path.getsize(filepath)
+    if size <= chunk_bytes:
+        return [(filepath, 0, size)]
+    return [
+        (filepath, start, min(start + chunk_bytes, size))
+        for start in range(0, size, chunk_bytes)
+    ]
+
+
+def count_range(task):
+    """Count the tokens that start inside [start, end) of a file.
+
+    Ranges are cut on ASCII whitespace, which never occurs inside a
+    multi-byte UTF-8 character, so every token is counted exactly once.
+    Also returns the sha256 of the range's own bytes for the manifest.
+    """
+    filepath, start, end = task
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+        digest = hashlib.sha256(data).digest()
+
+        # Finish a token that runs past the end of the range
+        if data and not data[-1:].isspace():
+            tail = bytearray()
+            while True:
+                byte = f.read(1)
+                if not byte or byte.isspace():
+                    break
+                tail += byte
+            data += tail
+
+        # Drop the end of a token that began in the previous range
+        if start > 0:
+            f.seek(start - 1)
+            if not f.read(1).isspace():
+                match = ASCII_SPACE.search(data)
+                data = data[match.start():] if match else b""
+
+    return filepath, Counter(data.decode("utf-8").split()), digest
+
+
+def combine_digests(range_digests):
+    """File digest: sha256 over the sha256 of each chunk_bytes range, so
+    workers can hash their ranges while counting them"""
+    combined = hashlib.sha256()
+    for digest in range_digests:
+        combined.update(digest)
+    return combined.hexdigest()
+
+
+def data_digest(data, chunk_bytes):
+    view = memoryview(data)
+    return combine_digests(
+        hashlib.sha256(view[start:start + chunk_bytes]).digest()
+        for start in range(0, max(len(data), 1), chunk_bytes)
+    )
+
+
+def file_digest(filepath, chunk_bytes):
+    """data_digest of a file, read one range at a time"""
+    digests = []
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(chunk_bytes), b""):
+            digests.append(hashlib.sha256(block).digest())
+    return combine_digests(digests or [hashlib.sha256(b"").digest()])
+
+
+def file_signature(filepath, digest, chunk_bytes):
+    info = os.stat(filepath)
+    return {
+        "size": info.st_size,
+        "mtime": info.st_mtime,
+        "sha256": digest,
+        "chunk_bytes": chunk_bytes,
+    }
+
+
+def list_segmented_files(segmented_dir):
+    return sorted(glob.glob(os.path.join(segmented_dir, "*_segmented.txt")))
+
+
+def build_corpus_stats(segmented_dir, workers=1, chunk_bytes=CHUNK_BYTES, manifest=False):
+    """Collect corpus statistics, optionally map-reducing over worker processes.
+
+    Workers count byte ranges of the files; partial counts are merged in
+    file order, so the result is identical to the serial path. Pass
+    manifest=True for statistics that will be saved and updated later.
+    """
+    return count_files(
+        list_segmented_files(segmented_dir), workers, chunk_bytes, manifest
+    )
+
+
+def count_files(filepaths, workers=1, chunk_bytes=CHUNK_BYTES, manifest=False):
+    """Count files, reading each one once; with manifest=True their digests
+    are computed from the same bytes"""
+    stats = CorpusStats()
+
+    if workers <= 1:
+        for filepath in filepaths:
+            with open(filepath, "rb") as f:
+                data = f.read()
+            stats.add_document(data.decode("utf-8").split())
+            if manifest:
+                stats.manifest[os.path.basename(filepath)] = file_signature(
+                    filepath, data_digest(data, chunk_bytes), chunk_bytes
+                )
+        return stats
+
+    def finish(filepath, counts, digests):
+        stats.add_counts(counts)
+        if manifest:
+            stats.manifest[os.path.basename(filepath)] = file_signature(
+                filepath, combine_digests(digests), chunk_bytes
+            )
+
+    tasks = [task for filepath in filepaths for task in split_ranges(filepath, chunk_bytes)]
+    current_file = None
+    current_counts = Counter()
+    current_digests = []
+    with Pool(workers) as pool:
+        for filepath, counts, digest in pool.imap(count_range, tasks):
+            if filepath != current_file:
+                if current_file is not None:
+                    finish(current_file, current_counts, current_digests)
+                current_file = filepath
+                current_counts = Counter()
+                current_digests = []
+            current_counts.update(counts)
+            current_digests.append(digest)
+    if current_file is not None:
+        finish(current_file, current_counts, current_digests)
+    return stats
+
+
+def load_corpus_stats(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    stats = CorpusStats()
+    stats.doc_count = data["doc_count"]
+    stats.word_doc_freq = Counter(data["word_doc_freq"])
+    stats.total_word_counts = Counter(data["total_word_counts"])
+    stats.manifest = data.get("manifest", {})
+    return stats
+
+
+def update_corpus_stats(stats, segmented_dir, workers=1, chunk_bytes=CHUNK_BYTES):
+    """Bring saved statistics up to date with the segmented directory.
+
+    Only files missing from the manifest are counted. Files whose size or
+    mtime changed are re-hashed; a changed or deleted file cannot be
+    subtracted from the totals, so that case falls back to a full rebuild.
+    So do statistics whose manifest does not account for every counted
+    document (saved without one), since their files cannot be told apart
+    from new ones. Returns (stats, names of the files that were counted).
+    """
+    filepaths = list_segmented_files(segmented_dir)
+    names = {os.path.basename(path) for path in filepaths}
+    # Every file is one document, so a complete manifest has doc_count entries
+    incomplete = len(stats.manifest) != stats.doc_count
+    if incomplete or any(name not in names for name in stats.manifest):
+        rebuilt = count_files(filepaths, workers, chunk_bytes, manifest=True)
+        return rebuilt, sorted(names)
+
+    new_files = []
+    for filepath in filepaths:
+        name = os.path.basename(filepath)
+        known = stats.manifest.get(name)
+        if known is None:
+            new_files.append(filepath)
+            continue
+
+        info = os.stat(filepath)
+        if info.st_size == known["size"] and info.st_mtime == known["mtime"]:
+            continue
+        digest = file_digest(filepath, known.get("chunk_bytes", chunk_bytes))
+        if digest != known["sha256"]:
+            rebuilt = count_files(filepaths, workers, chunk_bytes, manifest=True)
+            return rebuilt, sorted(names)
+        # Touched but identical (e.g. re-segmented): just record the new mtime
+        known["mtime"] = info.st_mtime
+
+    if new_files:
+        stats.merge(count_files(new_files, workers, chunk_bytes, manifest=True))
+    return stats, [os.path.basename(path) for path in new_files]
@@ -1,8 +1,10 @@
-import os
-import glob
-from collections import Counter, defaultdict
 import yaml
 
+from src.stopword_detection.corpus_stats import (
+    build_approximate_stats,
+    build_corpus_stats,
+)
+
 
 class FrequencyAnalyzer:
     def __init__(self, config_path="config/config.yaml"):
@@ -10,27 +12,26 @@ class FrequencyAnalyzer:
             self.config = yaml.safe_load(f)
         self.threshold = self.config["stopword_detection"]["frequency_threshold"]
         self.min_docs = self.config["stopword_detection"]["min_doc_frequency"]
-
-    def analyze_corpus(self, segmented_dir):
-        doc_count = 0
-        word_doc_freq = defaultdict(int)
-        total_word_counts = Counter()
-
-        for filepath in glob.glob(os.path.join(segmented_dir, "*_segmented.txt")):
-            doc_count += 1
-            with open(filepath, "r", encoding="utf-8") as f:
-                tokens = f.read().split()
-                unique_tokens = set(tokens)
-
-                for token in unique_tokens:
-                    word_doc_freq[token] += 1
-
-                total_word_counts.update(tokens)
+        self.approximate_config = self.config["stopword_detection"].get("approximate", {})
+
+    def analyze_corpus(self, segmented_dir, workers=1, approximate=False):
+        if approximate:
+            stats = build_approximate_stats(segmented_dir, **self.approximate_config)
+        else:
+            stats = build_corpus_stats(segmented_dir, workers=workers)
+        return self.find_candidates(stats)
+
+    def find_candidates(self, stats, threshold=None, min_docs=None):
+        threshold = self.threshold if threshold is None else threshold
+        min_docs = self.min_docs if min_docs is None else min_docs
+        doc_count = stats.doc_count
+        word_doc_freq = stats.word_doc_freq
+        total_word_counts = stats.total_word_counts
 
         candidate_stopwords = []
         for word, doc_freq in word_doc_freq.items():
             doc_frequency_ratio = doc_freq / doc_count
-            if doc_frequency_ratio >= self.threshold and doc_freq >= self.min_docs:
+            if doc_frequency_ratio >= threshold and doc_freq >= min_docs:
                 candidate_stopwords.append(
                     {
                         "word": word,
@@ -1,5 +1,4 @@
-import os
-import glob
+from src.stopword_detection.corpus_stats import build_corpus_stats
 
 
 class LinguisticRules:
@@ -49,12 +48,7 @@ class LinguisticRules:
         }
 
     def build_vocabulary(self, segmented_dir):
-        vocabulary = set()
-        for filepath in glob.glob(os.path.join(segmented_dir, "*_segmented.txt")):
-            with open(filepath, "r", encoding="utf-8") as f:
-                tokens = f.read().split()
-                vocabulary.update(tokens)
-        return vocabulary
+        return set(build_corpus_stats(segmented_dir).vocabulary)
 
     def identify_linguistic_stopwords(self, vocabulary):
         return [word for word in vocabulary if word in self.function_words]
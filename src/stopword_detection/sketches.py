@@ -0,0 +1,82 @@
+import math
+import heapq
+import hashlib
+
+
+class CountMinSketch:
+    """Approximate counter with fixed memory.
+
+    Estimates never undercount; with probability 1 - delta they overcount
+    by at most epsilon * (total of all increments).
+    """
+
+    def __init__(self, epsilon=0.0001, delta=0.001):
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.rows = [[0] * self.width for _ in range(self.depth)]
+        self.total = 0
+
+    def indexes(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8 * self.depth).digest()
+        for row in range(self.depth):
+            chunk = digest[8 * row:8 * (row + 1)]
+            yield row, int.from_bytes(chunk, "little") % self.width
+
+    def add(self, key, count=1):
+        self.total += count
+        for row, index in self.indexes(key):
+            self.rows[row][index] += count
+
+    def update(self, counts):
+        for key, count in counts.items():
+            self.add(key, count)
+
+    def __getitem__(self, key):
+        return min(self.rows[row][index] for row, index in self.indexes(key))
+
+
+class SpaceSaving:
+    """Top-k heavy hitters in at most `capacity` counters.
+
+    Every item whose true count exceeds total / capacity is tracked, and a
+    tracked item's count overestimates the truth by at most errors[item].
+    """
+
+    def __init__(self, capacity=50000):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.heap = []
+        self.total = 0
+
+    def add(self, item, count=1):
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            evicted, floor = self.pop_min()
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+        heapq.heappush(self.heap, (self.counts[item], item))
+
+        # Lazy deletion leaves stale entries behind; keep the heap bounded
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(c, i) for i, c in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def pop_min(self):
+        while True:
+            count, item = heapq.heappop(self.heap)
+            if self.counts.get(item) == count:
+                return item, count
+
+    def error_bound(self):
+        return self.total / self.capacity
+
+    def items(self):
+        return self.counts.items()
@@ -0,0 +1,123 @@
+import os
+import mmap
+import math
+import struct
+import hashlib
+
+MAGIC = b"KSWL"
+FORMAT_VERSION = 1
+# magic, format version, reserved, word count, sha256 of the word list
+HEADER = struct.Struct("<4sHHI32s")
+
+
+def stopword_checksum(words):
+    """sha256 of the sorted word list; identical for text and binary lists"""
+    digest = hashlib.sha256()
+    for word in sorted(w for w in words if w):
+        digest.update(word.encode("utf-8") + b"\n")
+    return digest.hexdigest()
+
+
+def build_artifact(words, output_path, doc_frequency_ratios=None):
+    """Compile a stopword list into the binary artifact format.
+
+    Layout after the header: (count + 1) uint32 offsets into the word blob,
+    count float32 doc-frequency ratios (NaN when unknown), then the sorted
+    UTF-8 words back to back. Returns the list checksum.
+    """
+    doc_frequency_ratios = doc_frequency_ratios or {}
+    encoded = sorted({w.encode("utf-8") for w in words if w})
+    checksum = stopword_checksum(w.decode("utf-8") for w in encoded)
+
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    ratios = [
+        doc_frequency_ratios.get(word.decode("utf-8"), math.nan) for word in encoded
+    ]
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC, FORMAT_VERSION, 0, len(encoded), bytes.fromhex(checksum)
+            )
+        )
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(struct.pack(f"<{len(ratios)}f", *ratios))
+        f.write(b"".join(encoded))
+    os.replace(tmp_path, output_path)
+    return checksum
+
+
+class StopwordArtifact:
+    """Read-only, memory-mapped stopword set.
+
+    Worker processes that open the same artifact share its verified bytes
+    through the OS page cache. Membership tests go to a frozenset built
+    from them once per process: a binary search over the mmap costs a
+    struct.unpack_from per probe, too slow for the per-token hot path.
+    Supports ``in``, ``len`` and iteration, so it can stand in for the set
+    returned by KhmerStopwordRemover.load_stopwords.
+    """
+
+    def __init__(self, path, verify=True):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self.count, checksum = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a stopword artifact")
+        if version != FORMAT_VERSION:
+            raise ValueError(
+                f"{path} has format version {version}, expected {FORMAT_VERSION}"
+            )
+        self.version = version
+        self.checksum = checksum.hex()
+
+        self.offsets_start = HEADER.size
+        self.ratios_start = self.offsets_start + 4 * (self.count + 1)
+        self.blob_start = self.ratios_start + 4 * self.count
+
+        if verify and stopword_checksum(self) != self.checksum:
+            raise ValueError(f"{path} failed checksum verification")
+        self.words = frozenset(self)
+
+    def word_bytes(self, index):
+        start, end = struct.unpack_from("<II", self.mm, self.offsets_start + 4 * index)
+        return self.mm[self.blob_start + start:self.blob_start + end]
+
+    def find(self, word):
+        """Index of word in the sorted list, or -1"""
+        key = word.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.word_bytes(lo) == key:
+            return lo
+        return -1
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.word_bytes(index).decode("utf-8")
+
+    def doc_frequency_ratio(self, word):
+        index = self.find(word)
+        if index < 0:
+            return None
+        (ratio,) = struct.unpack_from("<f", self.mm, self.ratios_start + 4 * index)
+        return None if math.isnan(ratio) else ratio
+
+    def close(self):
+        self.mm.close()